@@ -0,0 +1,297 @@
+"""Bulk offline analysis of recorded sessions.
+
+Scores archives of WAV and video recordings with the same models and
+scoring as the live WebSockets, across a pool of worker processes that
+each load the models once. Results stream to JSONL (or Parquet) as files
+finish, and a checkpoint lets an interrupted run resume where it stopped.
+
+    python -m app.batch recordings/ --output results.jsonl --workers 4
+    python -m app.batch manifest.jsonl --output results.parquet --resume
+
+Input is a directory (a WAV and a video with the same name form one
+session) or a manifest: JSONL lines with "id", "audio" and/or "video"
+paths, or a text file with one path per line.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Same import layout as main.py: ``app.*`` from backend/, ``config`` from app/
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+for path in (BACKEND_DIR, BACKEND_DIR / "app"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from config import VIDEO_SETTINGS  # noqa: E402
+from app.videobot.video_file import VIDEO_EXTENSIONS  # noqa: E402
+
+logger = logging.getLogger("DepressionDetection")
+
+AUDIO_EXTENSIONS = {".wav"}
+
+
+def discover(source: str) -> List[Dict[str, Any]]:
+    """Turn a directory or manifest into session items: {"id", "audio", "video"}"""
+    path = Path(source)
+    items: Dict[str, Dict[str, Any]] = {}
+
+    if path.is_dir():
+        for file in sorted(path.rglob("*")):
+            kind = ("audio" if file.suffix.lower() in AUDIO_EXTENSIONS
+                    else "video" if file.suffix.lower() in VIDEO_EXTENSIONS else None)
+            if kind:
+                item_id = str(file.relative_to(path).with_suffix(""))
+                items.setdefault(item_id, {"id": item_id})[kind] = str(file)
+        return list(items.values())
+
+    base = path.parent
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.suffix == ".jsonl":
+                entry = json.loads(line)
+                item = {"id": str(entry.get("id") or entry.get("audio") or entry.get("video"))}
+                for kind in ("audio", "video"):
+                    if entry.get(kind):
+                        item[kind] = str(base / entry[kind])
+            else:
+                file = base / line
+                kind = "video" if file.suffix.lower() in VIDEO_EXTENSIONS else "audio"
+                item = {"id": line, kind: str(file)}
+            items[item["id"]] = item
+    return list(items.values())
+
+
+class BatchAnalyzer:
+    """Per-process models; built once in each pool worker by ``_init_worker``"""
+
+    def __init__(self, use_llm: bool, video_interval: float):
+        from app.voicebot.stt import STT
+        self.stt = STT()
+        self.llm = None
+        if use_llm:
+            from app.voicebot.llm import LLMProcessor
+            self.llm = LLMProcessor()
+        self.detector = None
+        self.video_interval = video_interval
+
+    def _analyze_audio(self, path: str, session_id: str) -> Dict[str, Any]:
+        from app.utils.audio import wav_to_float32
+        with open(path, "rb") as f:
+            audio = wav_to_float32(f.read())
+        # transcribe_array has no duration cap, unlike live uploads
+        transcription, error = self.stt.transcribe_array(audio)
+        result = {"audio_seconds": round(len(audio) / 16000, 2), "transcription": transcription}
+        if error:
+            result["transcription_error"] = error
+        if transcription and self.llm is not None:
+            analysis = self.llm.analyze_depression(transcription, session_id)
+            result["voice"] = {key: analysis.get(key) for key in
+                               ("is_depressed", "confidence", "reason", "source")}
+        return result
+
+    def _analyze_video(self, path: str, session_id: str) -> Dict[str, Any]:
+        from app.videobot.emotion_detector import EmotionDetector
+        from app.videobot.video_capture import VideoCapture
+        from app.videobot.video_file import analyze_video_file
+        if self.detector is None:
+            self.detector = EmotionDetector()
+        analysis = analyze_video_file(
+            path, self.detector, VideoCapture.EMOTION_TO_DEPRESSION_SCORE, self.video_interval
+        )
+        result = VideoCapture._generate_result(session_id, analysis["session"])
+        result["timeline"] = analysis["timeline"]
+        return {"frames_analyzed": analysis["frames_analyzed"], "video_result": result}
+
+    def analyze(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        from app.utils.helpers import calculate_depression_score
+        started = time.perf_counter()
+        record = dict(item)
+        try:
+            if item.get("audio"):
+                record.update(self._analyze_audio(item["audio"], item["id"]))
+            if item.get("video"):
+                record.update(self._analyze_video(item["video"], item["id"]))
+            if "voice" in record or "video_result" in record:
+                record["depression_score"] = calculate_depression_score(
+                    record.get("voice", {}).get("is_depressed", False),
+                    record.get("video_result", {}).get("dominant_emotion", "neutral")
+                )
+        except Exception as e:
+            logger.exception(f"Batch analysis failed for {item['id']}")
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["processing_seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+
+_analyzer: Optional[BatchAnalyzer] = None
+
+
+def _init_worker(use_llm: bool, video_interval: float) -> None:
+    global _analyzer
+    _analyzer = BatchAnalyzer(use_llm, video_interval)
+
+
+def _analyze(item: Dict[str, Any]) -> Dict[str, Any]:
+    return _analyzer.analyze(item)
+
+
+class JSONLWriter:
+    """Appends one JSON line per record; ``write`` returns the ids now on disk"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> List[str]:
+        self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+        return [record["id"]]
+
+    def close(self) -> List[str]:
+        self.file.close()
+        return []
+
+
+class ParquetWriter:
+    """Writes a Parquet dataset directory, one closed part file per ``row_group_size`` records.
+
+    A Parquet file is unreadable until its footer is written, so records are
+    only reported durable (and checkpointed) once their part file is closed;
+    a resumed run simply adds more parts. Nested fields are stored as JSON strings.
+    """
+
+    COLUMNS = ("id", "audio", "video", "transcription", "audio_seconds", "frames_analyzed",
+               "depression_score", "processing_seconds", "error")
+
+    def __init__(self, path: str, row_group_size: int = 100):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.row_group_size = row_group_size
+        self.part = len([name for name in os.listdir(path) if name.endswith(".parquet")])
+        self.rows = []
+
+    def write(self, record: Dict[str, Any]) -> List[str]:
+        row = {column: record.get(column) for column in self.COLUMNS}
+        row["voice"] = json.dumps(record["voice"]) if "voice" in record else None
+        row["video_result"] = json.dumps(record["video_result"]) if "video_result" in record else None
+        self.rows.append(row)
+        return self._flush() if len(self.rows) >= self.row_group_size else []
+
+    def _flush(self) -> List[str]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not self.rows:
+            return []
+        table = pa.Table.from_pylist(self.rows, schema=self.schema())
+        pq.write_table(table, os.path.join(self.path, f"part-{self.part:05d}.parquet"))
+        self.part += 1
+        ids = [row["id"] for row in self.rows]
+        self.rows = []
+        return ids
+
+    @staticmethod
+    def schema():
+        import pyarrow as pa
+        return pa.schema([
+            ("id", pa.string()), ("audio", pa.string()), ("video", pa.string()),
+            ("transcription", pa.string()), ("audio_seconds", pa.float64()),
+            ("frames_analyzed", pa.int64()), ("depression_score", pa.float64()),
+            ("processing_seconds", pa.float64()), ("error", pa.string()),
+            ("voice", pa.string()), ("video_result", pa.string())
+        ])
+
+    def close(self) -> List[str]:
+        return self._flush()
+
+
+def load_checkpoint(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Bulk offline depression analysis of recorded sessions")
+    parser.add_argument("source", help="directory of recordings or manifest (.jsonl / .txt)")
+    parser.add_argument("--output", required=True,
+                        help="results.jsonl, or a results.parquet dataset directory")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--checkpoint", help="completed-item log (default: <output>.checkpoint)")
+    parser.add_argument("--resume", action="store_true", help="skip items already in the checkpoint")
+    parser.add_argument("--video-interval", type=float, default=VIDEO_SETTINGS["analysis_interval"],
+                        help="seconds between analyzed video frames")
+    parser.add_argument("--no-llm", action="store_true", help="transcribe only; skip the LLM analysis")
+    args = parser.parse_args(argv)
+
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    items = discover(args.source)
+    if args.resume:
+        done = load_checkpoint(checkpoint_path)
+        items = [item for item in items if item["id"] not in done]
+    elif os.path.exists(checkpoint_path):
+        sys.exit(f"{checkpoint_path} exists: pass --resume to continue that run, or remove it")
+    logger.info(f"Analyzing {len(items)} sessions with {args.workers} workers")
+
+    writer = ParquetWriter(args.output) if args.output.endswith(".parquet") else JSONLWriter(args.output)
+    totals = {"files": 0, "errors": 0, "audio_seconds": 0.0, "frames": 0, "processing_seconds": 0.0}
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")  # TF/torch must not be forked after import
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    def mark_done(ids):
+        # Only ids whose records are safely on disk, so a crash never loses a result
+        for item_id in ids:
+            checkpoint.write(item_id + "\n")
+        checkpoint.flush()
+
+    try:
+        with ProcessPoolExecutor(args.workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(not args.no_llm, args.video_interval)) as pool:
+            futures = [pool.submit(_analyze, item) for item in items]
+            for future in as_completed(futures):
+                record = future.result()
+                mark_done(writer.write(record))
+
+                totals["files"] += 1
+                totals["errors"] += "error" in record
+                totals["audio_seconds"] += record.get("audio_seconds", 0.0)
+                totals["frames"] += record.get("frames_analyzed", 0)
+                totals["processing_seconds"] += record["processing_seconds"]
+                if totals["files"] % 10 == 0:
+                    logger.info(f"{totals['files']}/{len(items)} sessions done")
+    finally:
+        mark_done(writer.close())
+        checkpoint.close()
+
+    wall = time.perf_counter() - started
+    report = {
+        "sessions": totals["files"],
+        "errors": totals["errors"],
+        "wall_seconds": round(wall, 2),
+        "files_per_min": round(totals["files"] / wall * 60, 2) if wall else 0.0,
+        "frames_per_sec": round(totals["frames"] / wall, 2) if wall else 0.0,
+        "audio_seconds_per_sec": round(totals["audio_seconds"] / wall, 2) if wall else 0.0,
+        "worker_seconds": round(totals["processing_seconds"], 2),
+        "output": writer.path
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,28 @@
 import os
+import atexit
+import importlib.util
+import queue
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
+import logging.handlers
 import sys
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("depression_detection.log", mode='a')
-    ]
-)
+# Set up logging. Request paths only enqueue records; a listener thread does
+# the formatting and the stdout/file writes. LOG_LEVEL=DEBUG adds prompt dumps.
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler("depression_detection.log", mode='a')
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+_log_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # the listener's handlers add the rest
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[_queue_handler])
 
 logger = logging.getLogger("DepressionDetection")
 
@@ -30,6 +40,7 @@ else:
 # Now read environment variables
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL_NAME = os.getenv("GROQ_MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # e.g. a local stub server; None uses the Groq API
 
 # Validate required keys with better error handling
 if not GROQ_API_KEY:
@@ -49,6 +60,16 @@ if FACE_MODEL_PATH.exists():
 else:
     logger.warning(f"Face model not found at {FACE_MODEL_PATH}")
 
+# Face emotion inference engine. Backends: "keras" (face_model.h5 on
+# TensorFlow), "onnx" (ONNX Runtime) and "tflite" (TFLite interpreter); the
+# last two load files written by ``python -m app.videobot.export_face_model``.
+FACE_MODEL_SETTINGS = {
+    "backend": os.getenv("FACE_BACKEND", "keras"),
+    "onnx_path": Path(os.getenv("FACE_ONNX_PATH", str(MODELS_DIR / "face_model.onnx"))),
+    "tflite_path": Path(os.getenv("FACE_TFLITE_PATH", str(MODELS_DIR / "face_model.tflite"))),
+    "threads": int(os.getenv("FACE_THREADS", "0"))  # intra-op threads; 0 = runtime default
+}
+
 # Supported Languages
 SUPPORTED_LANGUAGES = {
     'en': 'English',
@@ -68,15 +89,138 @@ AUDIO_SETTINGS = {
     "chunk_size": 1024,
     "format": "wav",
     "max_duration": 300,  # 5 minutes max
-    "min_duration": 0.5   # 0.5 seconds min
+    "min_duration": 0.5,  # 0.5 seconds min
+    # Streaming transcription: energy VAD over chunk_size PCM chunks
+    "vad_frame_ms": 30,
+    "vad_energy_threshold": 0.01,  # frame RMS (float scale) counted as speech
+    "segment_silence_ms": 300,     # pause that closes a segment for transcription
+    "end_of_speech_ms": 900,       # silence that ends the utterance
+    "max_segment_duration": 10,    # seconds; long speech is cut into segments
+    # Batched Whisper: utterances from concurrent sessions share one encoder pass
+    "stt_batching": True,
+    "stt_batch_window_ms": 50,     # how long the first utterance waits for company
+    "stt_max_batch_size": 8
+}
+
+# Speech-to-text engine. Backends: "openai" (reference PyTorch model),
+# "openai-int8" (same model, dynamically quantized Linear layers) and
+# "faster-whisper" (CTranslate2, int8 CPU kernels).
+WHISPER_SETTINGS = {
+    "backend": os.getenv("WHISPER_BACKEND", "openai"),
+    "model_size": os.getenv("WHISPER_MODEL", "base"),      # tiny | base | small | medium | ...
+    "language": os.getenv("WHISPER_LANGUAGE", "en"),       # a SUPPORTED_LANGUAGES code or "auto"
+    "compute_type": os.getenv("WHISPER_COMPUTE_TYPE", "int8"),  # faster-whisper only
+    "cpu_threads": int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0 = library default
 }
 
 # Video processing settings
 VIDEO_SETTINGS = {
     "max_duration": 1800,  # 30 minutes
-    "analysis_interval": 2,  # seconds
+    "analysis_interval": 2,  # seconds between analyzed WebSocket frames
+    "adaptive_sampling": True,   # stretch the interval when analysis is slow
+    "max_analysis_interval": 5,  # upper bound on result staleness, seconds
     "frame_width": 640,
-    "frame_height": 480
+    "frame_height": 480,
+    "face_detection_mode": "full",  # "full" or "tracking" (skip-frame ROI tracking)
+    "detection_interval": 5,        # tracking mode: full detection every N frames
+    "detection_scale": 1.0,         # downscale factor applied before full detection
+    "tracking_margin": 0.25,        # ROI padding around the last face, as a fraction of its size
+    "max_faces": 8,                 # faces classified per frame, largest first
+    "face_id_iou": 0.3,             # min box overlap for a face to keep its id between frames
+    "face_id_max_missed": 5,        # analyzed frames a face may be missing before its id is retired
+    "max_people_per_session": 32,   # per-person aggregates kept per session, most recent first
+    # Session aggregates: "memory" (single worker) or "sqlite" (shared by all workers on a host)
+    "session_store": os.getenv("VIDEO_SESSION_STORE", "memory"),
+    "session_store_path": os.getenv(
+        "VIDEO_SESSION_DB", str(project_root / "backend" / "data" / "video_sessions.db")
+    ),
+    "session_ttl": 600,             # evict sessions idle this many seconds
+    "eviction_interval": 60,        # how often to sweep for idle sessions
+    "trend_bucket_seconds": 60,     # width of one trend bucket
+    "trend_buckets": 30,            # ring buffer length; 0 disables trends
+    "batching_enabled": True,  # micro-batch face crops across sessions
+    "batch_window_ms": 8,      # how long the first face waits for company
+    "max_batch_size": 32,
+    "frame_workers": 4,        # threads decoding frames and detecting faces off the event loop
+    # Uploaded video files (POST /api/video/analyze-file)
+    "max_upload_mb": 500,
+    "file_seek_min_interval": 10   # from this sampling interval up, seek rather than walk the stream
+}
+
+# Model loading. Workers only load the models of the modalities they serve,
+# e.g. ENABLED_MODALITIES=voice for a voice-only worker.
+ENABLED_MODALITIES = [
+    m.strip() for m in os.getenv("ENABLED_MODALITIES", "voice,video").split(",") if m.strip()
+]
+MODEL_SETTINGS = {
+    "modality_models": {"voice": ["whisper", "tts"], "video": ["face"]},
+    "warmup_on_startup": os.getenv("WARMUP_MODELS", "false").lower() in ("1", "true", "yes")
+}
+
+# Inference scheduler settings (per-stage worker pools with bounded queues)
+INFERENCE_SETTINGS = {
+    "stt": {"workers": 2, "max_queue": 10},   # Whisper is CPU-bound; with batching, up to 12 utterances in flight
+    "llm": {"workers": 8, "max_queue": 16},   # admission limit for the async Groq client
+    "tts": {"workers": 4, "max_queue": 8},    # network bound
+    "video_file": {"workers": 1, "max_queue": 2},  # whole-file analyses; each keeps a core busy
+    "busy_retry_after": 2.0  # seconds suggested to clients on a "busy" frame
+}
+
+# Async LLM client settings (one pooled client per worker process)
+LLM_SETTINGS = {
+    "timeout": 10,             # seconds per HTTP attempt
+    "max_concurrency": 16,     # in-flight Groq requests per process
+    "max_connections": 32,     # HTTP connection pool size
+    "max_retries": 3,          # retries of transient failures
+    "backoff_base": 0.25,      # seconds; exponential backoff with full jitter
+    "backoff_max": 4.0,
+    "hedge_enabled": False,    # send a second request once p95 latency is exceeded
+    "hedge_percentile": 95,
+    "hedge_min_samples": 20    # latencies needed before hedging kicks in
+}
+
+# Text-to-speech. "gtts" needs network access to Google; "pyttsx3" and
+# "espeak" synthesize locally for offline/air-gapped deployments.
+TTS_SETTINGS = {
+    "backend": os.getenv("TTS_BACKEND", "gtts"),    # gtts | pyttsx3 | espeak
+    "voice": os.getenv("TTS_VOICE", ""),            # backend-specific voice id; "" = default
+    "cache_enabled": True,
+    "memory_cache_bytes": 32 * 1024 * 1024,
+    "disk_cache_dir": os.getenv("TTS_CACHE_DIR", str(project_root / "backend" / "data" / "tts_cache")),
+    "disk_cache_bytes": 512 * 1024 * 1024,          # 0 disables the size limit
+    "max_cached_chars": 300,                        # longer one-off replies are not cached
+    "prewarm_phrases": [                            # synthesized at warmup so fallbacks are instant
+        "Let's continue our conversation.",
+        "I'm having trouble understanding right now.",
+        "Audio could not be understood.",
+        "Error analyzing depression status."
+    ]
+}
+
+# Cache of LLM answers keyed on the normalized transcript + history window.
+# Disable for deployments where replies must always reflect fresh model output.
+LLM_CACHE_SETTINGS = {
+    "enabled": os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes"),
+    "ttl": 3600,             # seconds
+    "max_entries": 5000,
+    "include_history": True  # False keys on the transcript alone (more hits, less context-aware)
+}
+
+# Per-session conversation memory for the LLM prompt
+CONVERSATION_SETTINGS = {
+    "max_sessions": 1000,          # LRU bound per worker
+    "session_ttl": 1800,           # seconds without a turn before a session is dropped
+    "max_turns": 3,                # recent exchanges quoted verbatim in the prompt
+    "history_token_budget": 400,   # approximate tokens for the quoted exchanges
+    "summary_token_budget": 150    # approximate tokens for the rolling summary of older turns
+}
+
+# Live voice + video fusion per session (weights come from DEPRESSION_ANALYSIS)
+FUSION_SETTINGS = {
+    "max_sessions": 1000,
+    "session_ttl": 1800,
+    "half_life_seconds": {"voice": 120, "video": 20},  # how fast old evidence fades
+    "full_evidence": {"voice": 1.0, "video": 5.0}      # decayed event weight for a modality's full say
 }
 
 # Depression analysis settings
@@ -87,56 +231,108 @@ DEPRESSION_ANALYSIS = {
     "depression_keywords": [
         "sad", "depressed", "hopeless", "worthless", "tired", 
         "empty", "lonely", "anxious", "worried", "stressed"
-    ]
+    ],
+    # Local pre-screen: answers confident utterances without calling the LLM
+    "prescreen_enabled": os.getenv("PRESCREEN", "true").lower() in ("1", "true", "yes"),
+    "full_analysis_every": 4,   # at most 3 pre-screened turns in a row per session
+    "depression_phrases": [
+        "can't sleep", "cannot sleep", "no energy", "no motivation", "don't care anymore",
+        "nothing matters", "no point", "cry all the time", "can't focus", "feel like a failure",
+        "exhausted", "miserable", "numb", "alone"
+    ],
+    "positive_keywords": [
+        "fine", "good", "great", "happy", "okay", "ok", "better", "excited",
+        "relaxed", "calm", "grateful", "wonderful", "enjoying"
+    ],
+    # Always sent to the LLM, whatever the local confidence. Regular expressions,
+    # matched on whole words, so they cover inflections and spelling variants.
+    "risk_phrases": [
+        r"kill(?:s|ing|ed)?\s+my\s*self", r"hurt(?:s|ing)?\s+my\s*self", r"cut(?:s|ting)?\s+my\s*self",
+        r"harm(?:s|ing|ed)?\s+my\s*self", r"self[\s-]*harm(?:s|ing|ed)?", r"suicid\w*",
+        r"end(?:s|ing|ed)?\s+(?:it\s+all|my\s+(?:own\s+)?life|things)",
+        r"take\s+my\s+(?:own\s+)?life", r"(?:want|wanted|wanting|wish)\s+(?:to\s+|i\s+was\s+|i\s+were\s+)?(?:die|dead)",
+        r"better\s+off\s+(?:dead|without\s+me)", r"no\s+reason\s+to\s+(?:live|go\s+on)",
+        r"don'?t\s+want\s+to\s+(?:live|be\s+here|wake\s+up)", r"not\s+worth\s+living"
+    ],
+    # Keywords that must agree (with no depressive or risk term anywhere) before
+    # an utterance is answered locally; fewer goes to the LLM
+    "prescreen_min_evidence": 2,
+    "prescreen_model_path": os.getenv("PRESCREEN_MODEL"),  # optional joblib text classifier
+    "prescreen_responses": {
+        "depressed": [
+            "That sounds really hard. Can you tell me more about what's been weighing on you?",
+            "Thank you for telling me. How long have you been feeling this way?",
+            "I'm sorry you're going through that. What has your sleep and energy been like?"
+        ],
+        "not_depressed": [
+            "I'm glad to hear that. What has been going well for you lately?",
+            "Thanks for sharing. How have things been at home and at work?",
+            "That's good to hear. Is there anything on your mind you'd like to talk about?"
+        ]
+    }
 }
 
 # Check dependencies
 def check_dependencies():
-    """Check if required dependencies are available"""
+    """Check if required dependencies are installed, without importing them"""
     missing_deps = []
     
-    try:
-        import whisper
+    if WHISPER_SETTINGS["backend"] == "faster-whisper":
+        if importlib.util.find_spec("faster_whisper"):
+            logger.info("faster-whisper available")
+        else:
+            missing_deps.append("faster-whisper")
+            logger.error("faster-whisper not available")
+    elif importlib.util.find_spec("whisper"):
         logger.info("Whisper available")
-    except ImportError:
+    else:
         missing_deps.append("openai-whisper")
         logger.error("Whisper not available")
     
-    try:
-        import cv2
+    if importlib.util.find_spec("cv2"):
         logger.info("OpenCV available")
-    except ImportError:
+    else:
         missing_deps.append("opencv-python")
         logger.error("OpenCV not available")
     
-    try:
-        import tensorflow
+    if FACE_MODEL_SETTINGS["backend"] == "onnx":
+        if importlib.util.find_spec("onnxruntime"):
+            logger.info("ONNX Runtime available")
+        else:
+            missing_deps.append("onnxruntime")
+            logger.error("ONNX Runtime not available")
+    elif FACE_MODEL_SETTINGS["backend"] == "tflite":
+        if any(importlib.util.find_spec(name) for name in ("ai_edge_litert", "tflite_runtime", "tensorflow")):
+            logger.info("TFLite interpreter available")
+        else:
+            missing_deps.append("tflite-runtime")
+            logger.error("TFLite interpreter not available")
+    elif importlib.util.find_spec("tensorflow"):
         logger.info("TensorFlow available")
-    except ImportError:
+    else:
         missing_deps.append("tensorflow")
         logger.error("TensorFlow not available")
     
-    try:
-        import pydub
+    if importlib.util.find_spec("pydub"):
         logger.info("Pydub available")
-    except ImportError:
+    else:
         missing_deps.append("pydub")
         logger.error("Pydub not available")
     
-    try:
-        import gtts
+    if TTS_SETTINGS["backend"] != "gtts":
+        logger.info(f"Using offline TTS backend: {TTS_SETTINGS['backend']}")
+    elif importlib.util.find_spec("gtts"):
         logger.info("gTTS available")
-    except ImportError:
+    else:
         missing_deps.append("gtts")
         logger.error("gTTS not available")
     
-    try:
-        import groq
+    if importlib.util.find_spec("groq"):
         if GROQ_API_KEY:
             logger.info("Groq client available with API key")
         else:
             logger.warning("Groq client available but no API key")
-    except ImportError:
+    else:
         missing_deps.append("groq")
         logger.error("Groq client not available")
     
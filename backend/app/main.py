@@ -1,14 +1,17 @@
 import sys
+import asyncio
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 import datetime
 
 # Add the backend directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
-# Now import your routes
-from app.routes import voice_routes, video_routes
+from config import ENABLED_MODALITIES, MODEL_SETTINGS
+from app.utils.model_registry import registry
+from app.utils.metrics import metrics
 
 app = FastAPI(
     title="Depression Detection API",
@@ -27,19 +30,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(
-    voice_routes.router,
-    prefix="/api/voice",
-    tags=["Voice Analysis"]
-)
+# Include routers only for the modalities this worker serves, so a
+# voice-only worker never imports TensorFlow and a video-only one never loads Whisper
+if "voice" in ENABLED_MODALITIES:
+    from app.routes import voice_routes
+    app.include_router(
+        voice_routes.router,
+        prefix="/api/voice",
+        tags=["Voice Analysis"]
+    )
+
+if "video" in ENABLED_MODALITIES:
+    from app.routes import video_routes
+    app.include_router(
+        video_routes.router,
+        prefix="/api/video",
+        tags=["Video Analysis"]
+    )
 
+# Fusion holds no models; it combines whatever this worker's voice/video sockets report
+from app.routes import fusion_routes
 app.include_router(
-    video_routes.router,
-    prefix="/api/video",
-    tags=["Video Analysis"]
+    fusion_routes.router,
+    prefix="/api/fusion",
+    tags=["Multimodal Fusion"]
 )
 
+@app.on_event("startup")
+async def warmup_models():
+    """Optionally load and warm up this worker's models before serving traffic"""
+    if not MODEL_SETTINGS["warmup_on_startup"]:
+        return
+    names = [
+        name
+        for modality in ENABLED_MODALITIES
+        for name in MODEL_SETTINGS["modality_models"].get(modality, [])
+    ]
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, registry.warmup, names)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """This worker's stage latencies, queue depths, sessions and error counts"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/models", include_in_schema=False)
+async def model_status():
+    return {"modalities": ENABLED_MODALITIES, "models": registry.stats()}
+
 @app.get("/", include_in_schema=False)
 async def root():
     return {
@@ -47,7 +85,8 @@ async def root():
         "endpoints": {
             "documentation": ["/docs", "/redoc"],
             "voice": "/api/voice",
-            "video": "/api/video"
+            "video": "/api/video",
+            "fusion": "/api/fusion"
         }
     }
 
@@ -0,0 +1,69 @@
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.logger import logger
+from app.utils.fusion import fusion_engine
+from app.utils.metrics import ACTIVE_SESSIONS
+
+router = APIRouter()
+
+ACTIVE_SESSIONS.track(lambda: fusion_engine.stats()["sessions"], kind="fusion_sessions")
+ACTIVE_SESSIONS.track(lambda: fusion_engine.stats()["subscribers"], kind="fusion_ws")
+
+
+async def _until_disconnect(websocket: WebSocket) -> None:
+    """Read (and ignore) client messages until the client goes away"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/ws/{session_id}")
+async def fusion_websocket(websocket: WebSocket, session_id: str):
+    """Push the session's fused score every time its voice or video socket reports a result"""
+    await websocket.accept()
+    queue = fusion_engine.subscribe(session_id)
+    # Idle sessions publish nothing, so watch for the disconnect separately
+    disconnected = asyncio.create_task(_until_disconnect(websocket))
+    logger.info(f"Fusion WebSocket connected for session: {session_id}")
+    try:
+        current = fusion_engine.get(session_id)
+        if current is not None:
+            await websocket.send_json({"type": "fusion", **current})
+        while True:
+            snapshot = asyncio.create_task(queue.get())
+            await asyncio.wait({snapshot, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                snapshot.cancel()
+                break
+            await websocket.send_json({"type": "fusion", **snapshot.result()})
+        logger.info(f"Fusion WebSocket disconnected for session: {session_id}")
+    except WebSocketDisconnect:
+        logger.info(f"Fusion WebSocket disconnected for session: {session_id}")
+    finally:
+        disconnected.cancel()
+        fusion_engine.unsubscribe(session_id, queue)
+
+
+@router.get("/results/{session_id}")
+async def get_fused_results(session_id: str):
+    """Latest fused voice + video score for a session"""
+    results = fusion_engine.get(session_id)
+    if results is None:
+        return {
+            "status": "error",
+            "message": "No results found for this session"
+        }
+    return {
+        "status": "success",
+        "results": results
+    }
+
+
+@router.get("/stats")
+async def get_fusion_stats():
+    return {
+        "status": "success",
+        "fusion": fusion_engine.stats()
+    }
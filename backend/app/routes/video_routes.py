@@ -1,37 +1,95 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
 from fastapi.logger import logger
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
 import numpy as np
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
+from config import INFERENCE_SETTINGS, VIDEO_SETTINGS
 from app.videobot.video_capture import VideoCapture
+from app.videobot.video_file import VIDEO_EXTENSIONS
+from app.videobot.frame_sampler import AdaptiveSampler, LatestFrameSlot
+from app.utils.inference_scheduler import InferenceScheduler, SchedulerBusy
+from app.utils.fusion import fusion_engine
+from app.utils.metrics import ACTIVE_SESSIONS, QUEUE_DEPTH, STAGE_SECONDS, ERRORS
 
 router = APIRouter()
 video_capture = VideoCapture()
+# Whole-file analyses get their own bounded pool so they never delay live frames
+file_scheduler = InferenceScheduler({
+    "video_file": INFERENCE_SETTINGS["video_file"],
+    "busy_retry_after": INFERENCE_SETTINGS["busy_retry_after"]
+})
+# Room for the multipart boundaries and the other form fields around the video
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+QUEUE_DEPTH.track(lambda: file_scheduler.queue_depth("video_file"), queue="video_file")
+if video_capture.batcher is not None:
+    QUEUE_DEPTH.track(video_capture.batcher.queue_depth, queue="emotion_batcher")
+
+
+async def _receive_frames(websocket: WebSocket, slot: LatestFrameSlot):
+    """Reader task: keep only the newest frame from the client"""
+    try:
+        while True:
+            slot.put(await websocket.receive_bytes())
+    except Exception as e:
+        slot.close(e)
+
 
 @router.websocket("/ws/video/{session_id}")
 async def video_websocket(websocket: WebSocket, session_id: str):
     await websocket.accept()
     logger.info(f"Video WebSocket connected for session: {session_id}")
-    
+
+    slot = LatestFrameSlot()
+    sampler = AdaptiveSampler()
+    reader = asyncio.create_task(_receive_frames(websocket, slot))
+    ACTIVE_SESSIONS.inc(kind="video_ws")
+
     try:
         while True:
-            # Receive frame as bytes
-            data = await websocket.receive_bytes()
-            
+            # Latest frame wins; anything that arrived in between is dropped
+            data, received_at, dropped = await slot.take()
+            started = time.perf_counter()
+
             # Process frame
             result = await video_capture.process_frame(data, session_id)
-            
+            sampler.record(time.perf_counter() - started)
+
             if "error" in result:
+                ERRORS.inc(component="video", reason="frame_error")
                 await websocket.send_json({"type": "error", "message": result["error"]})
                 continue
-            
-            await websocket.send_json({
-                "type": "analysis",
-                "emotion": result["emotion"],
-                "score": result["score"],
-                "timestamp": result["timestamp"]
-            })
-            
+            # Frames without a face carry no video evidence, so the video score fades instead
+            if result["faces"]:
+                fused = fusion_engine.record_video(session_id, result["score"])
+            else:
+                fused = fusion_engine.get(session_id)
+
+            with STAGE_SECONDS.time(stage="socket_send"):
+                await websocket.send_json({
+                    "type": "analysis",
+                    "emotion": result["emotion"],
+                    "score": result["score"],
+                    "faces": result["faces"],
+                    "timestamp": result["timestamp"],
+                    "dropped_frames": dropped,
+                    "total_dropped": slot.total_dropped,
+                    "latency_ms": round((time.perf_counter() - received_at) * 1000, 1),
+                    "analysis_interval": round(sampler.current_interval(), 3),
+                    "fused_score": fused["fused_score"] if fused else None
+                })
+
+            await asyncio.sleep(sampler.delay_until_next(started))
+
     except WebSocketDisconnect:
         logger.info(f"Video WebSocket disconnected for session: {session_id}")
         video_capture.cleanup_session(session_id)
@@ -39,6 +97,9 @@ async def video_websocket(websocket: WebSocket, session_id: str):
         logger.error(f"Video WebSocket error: {str(e)}")
         await websocket.send_json({"type": "error", "message": str(e)})
         video_capture.cleanup_session(session_id)
+    finally:
+        reader.cancel()
+        ACTIVE_SESSIONS.dec(kind="video_ws")
 
 @router.get("/results/{session_id}")
 async def get_video_results(session_id: str):
@@ -50,7 +111,7 @@ async def get_video_results(session_id: str):
                 "status": "error",
                 "message": "No results found for this session"
             }
-        
+
         return {
             "status": "success",
             "results": results
@@ -60,4 +121,81 @@ async def get_video_results(session_id: str):
         return {
             "status": "error",
             "message": str(e)
-        }
\ No newline at end of file
+        }
+
+@router.post("/analyze-file")
+async def analyze_video_file(request: Request, session_id: Optional[str] = None,
+                             interval: Optional[float] = None):
+    """Analyze a recording uploaded as the multipart field "file", one frame every ``interval`` seconds.
+
+    The form is parsed here rather than by an ``UploadFile`` parameter so the
+    size limit is enforced from Content-Length before any of the body is read.
+    """
+    max_bytes = VIDEO_SETTINGS["max_upload_mb"] * 1024 * 1024
+    length = request.headers.get("content-length", "")
+    if not length.isdigit():
+        return {"status": "error", "message": "Content-Length is required for uploads"}
+    if int(length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        return {
+            "status": "error",
+            "message": f"Video exceeds {VIDEO_SETTINGS['max_upload_mb']} MB"
+        }
+    if interval is not None and interval <= 0:
+        return {"status": "error", "message": "interval must be positive"}
+
+    form = await request.form(max_files=1)
+    file = form.get("file")
+    if not isinstance(file, UploadFile):
+        await form.close()
+        return {"status": "error", "message": 'Expected the video in a multipart field named "file"'}
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in VIDEO_EXTENSIONS:
+        await form.close()
+        return {
+            "status": "error",
+            "message": f"Unsupported video type '{suffix}'; use one of {sorted(VIDEO_EXTENSIONS)}"
+        }
+
+    session_id = session_id or f"file-{uuid.uuid4().hex[:12]}"
+    # OpenCV needs a path; Starlette's spooled file has none, so copy it off the event loop
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            await run_in_threadpool(shutil.copyfileobj, file.file, out)
+
+        results = await file_scheduler.run(
+            "video_file", video_capture.analyze_file, path, session_id, interval
+        )
+        return {
+            "status": "success",
+            "results": results
+        }
+    except SchedulerBusy:
+        return {
+            "status": "busy",
+            "retry_after": file_scheduler.busy_retry_after,
+            "message": "The server is busy. Please try again shortly."
+        }
+    except ValueError as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    except Exception as e:
+        logger.exception("Video file analysis failed")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    finally:
+        await form.close()
+        os.remove(path)
+
+@router.get("/stats")
+async def get_video_stats():
+    """Micro-batching metrics for face-emotion inference"""
+    return {
+        "status": "success",
+        "batching": video_capture.get_batching_stats(),
+        "file_analysis": file_scheduler.stats()
+    }
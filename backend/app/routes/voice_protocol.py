@@ -0,0 +1,153 @@
+import asyncio
+import base64
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.logger import logger
+from app.utils.metrics import ERRORS, STAGE_SECONDS
+from config import AUDIO_SETTINGS
+
+# Version 1 of the binary framing for /ws/conversation/{session_id}:
+#
+#   client -> {"type": "hello", "protocol": "binary", "version": 1}
+#   server -> {"type": "hello_ack", "protocol": "binary", "version": 1}
+#   client -> {"type": "audio", "size": <bytes>, ...}   JSON control header
+#   client -> <raw WAV bytes>                           one or more binary frames
+#   server -> {"type": "ai_response", "audio_size": <bytes>, "audio_format": "mp3", ...}
+#   server -> <raw audio bytes>                         one binary frame
+#
+# A bare binary frame with no pending header is treated as a complete clip.
+# Clients that never send "hello" keep the original base64-in-JSON protocol.
+#
+# Streaming transcription (either mode):
+#
+#   client -> {"type": "stream_start"}
+#   client -> <int16 mono PCM chunks>                   binary frames
+#   server -> {"type": "partial_transcript", "text": ..., "transcript": ...}
+#   server -> {"type": "ai_response", ...}              after end of speech
+#   client -> {"type": "stream_end"}
+#
+# Streamed replies (opt in with "stream_response": true on "hello" or on an
+# individual "audio"/"stream_start" message):
+#
+#   server -> {"type": "response_audio", "seq": 0, "text": <sentence>, ...}  + audio, per sentence
+#   server -> {"type": "ai_response", "streamed": true, "is_depressed": ...,
+#              "confidence_score": ..., "text_response": ..., "first_audio_ms": ...}
+#
+# A clip larger than MAX_AUDIO_BYTES (max_duration of 16-bit PCM, plus room
+# for the WAV header) closes the socket with 1009 "message too big".
+PROTOCOL_VERSION = 1
+SUPPORTED_VERSIONS = {1}
+MAX_AUDIO_BYTES = (int(AUDIO_SETTINGS["max_duration"] * AUDIO_SETTINGS["sample_rate"])
+                   * AUDIO_SETTINGS["channels"] * 2 + 4096)
+
+
+class VoiceConnection:
+    """Reads and writes voice messages in either JSON or binary framing mode"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.binary = False
+        self.streaming = False
+        self.stream_response = False
+        self._header: Optional[Dict[str, Any]] = None
+        self._chunks = []
+        self._received = 0
+        self._send_lock = asyncio.Lock()
+
+    async def _negotiate(self, data: Dict[str, Any]) -> None:
+        version = data.get("version", PROTOCOL_VERSION)
+        self.stream_response = bool(data.get("stream_response", False))
+        if data.get("protocol") == "binary" and version in SUPPORTED_VERSIONS:
+            self.binary = True
+            await self.websocket.send_json({
+                "type": "hello_ack", "protocol": "binary", "version": version,
+                "stream_response": self.stream_response
+            })
+        else:
+            self.binary = False
+            await self.websocket.send_json({
+                "type": "hello_ack", "protocol": "json", "version": PROTOCOL_VERSION,
+                "supported_versions": sorted(SUPPORTED_VERSIONS),
+                "stream_response": self.stream_response
+            })
+
+    async def _reject_oversized(self, size: int) -> None:
+        logger.warning(f"Closing voice socket: {size} audio bytes exceeds the {MAX_AUDIO_BYTES} byte limit")
+        ERRORS.inc(component="voice_protocol", reason="audio_too_large")
+        self._header, self._chunks, self._received = None, [], 0
+        await self.websocket.close(code=1009, reason="Audio exceeds the maximum duration")
+        raise WebSocketDisconnect(1009)
+
+    async def receive(self) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """Wait for the next complete client message; returns (header, audio bytes or None)"""
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("text") is not None:
+                data = json.loads(message["text"])
+                if data.get("type") == "hello":
+                    await self._negotiate(data)
+                    continue
+
+                if data.get("type") in ("stream_start", "stream_end"):
+                    self.streaming = data["type"] == "stream_start"
+                    return data, None
+
+                if data.get("type") == "audio" and "audio" not in data and self.binary:
+                    # Control header: the audio follows as binary frames
+                    declared = int(data.get("size") or 0)
+                    if declared > MAX_AUDIO_BYTES:
+                        await self._reject_oversized(declared)
+                    self._header, self._chunks, self._received = data, [], 0
+                    continue
+
+                audio = None
+                if data.get("type") == "audio":
+                    encoded = data.get("audio", "")
+                    if len(encoded) // 4 * 3 > MAX_AUDIO_BYTES:
+                        await self._reject_oversized(len(encoded) // 4 * 3)
+                    audio = base64.b64decode(encoded)
+                return data, audio
+
+            chunk = message.get("bytes")
+            if chunk is None:
+                continue
+            if self.streaming:
+                return {"type": "audio_chunk"}, chunk
+
+            if self._received + len(chunk) > MAX_AUDIO_BYTES:
+                await self._reject_oversized(self._received + len(chunk))
+            self._chunks.append(chunk)
+            self._received += len(chunk)
+
+            header = self._header or {"type": "audio"}
+            expected = int(header.get("size") or 0)
+            if expected and self._received < expected:
+                continue
+            if expected and self._received > expected:
+                logger.warning(f"Received {self._received} audio bytes, header announced {expected}")
+
+            audio = self._chunks[0] if len(self._chunks) == 1 else b"".join(self._chunks)
+            self._header, self._chunks, self._received = None, [], 0
+            return header, audio
+
+    def wants_streamed_reply(self, data: Dict[str, Any]) -> bool:
+        """Whether the reply to this message should be streamed sentence by sentence"""
+        return bool(data.get("stream_response", self.stream_response))
+
+    async def send(self, payload: Dict[str, Any], audio: bytes = b"", audio_format: str = "mp3") -> None:
+        """Send a server message, attaching audio inline (JSON mode) or as a binary frame"""
+        # Header and audio frame must stay adjacent when several tasks send
+        async with self._send_lock:
+            with STAGE_SECONDS.time(stage="socket_send"):
+                if not audio:
+                    await self.websocket.send_json(payload)
+                elif self.binary:
+                    await self.websocket.send_json(dict(payload, audio_size=len(audio), audio_format=audio_format))
+                    await self.websocket.send_bytes(audio)
+                else:
+                    await self.websocket.send_json(dict(payload, audio_response=base64.b64encode(audio).decode()))
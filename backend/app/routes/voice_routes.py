@@ -1,62 +1,332 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from fastapi.logger import logger
-import tempfile
-import os
-import base64
-import json
+import asyncio
+import time
+from collections import deque
 from app.voicebot.depression_nlp import VoiceBot
+from app.voicebot.vad import SpeechSegmenter
+from app.voicebot.llm_client import async_llm_client
+from app.routes.voice_protocol import VoiceConnection
+from app.utils.inference_scheduler import InferenceScheduler, SchedulerBusy
+from app.utils.fusion import fusion_engine
+from app.utils.metrics import ACTIVE_SESSIONS, QUEUE_DEPTH, ERRORS
 
 router = APIRouter()
 voice_bot = VoiceBot()
+scheduler = InferenceScheduler()
+first_audio_latencies = deque(maxlen=500)  # seconds from transcript to first streamed audio
+
+for _stage in ("stt", "llm", "tts"):
+    QUEUE_DEPTH.track(lambda stage=_stage: scheduler.queue_depth(stage), queue=_stage)
+if voice_bot.stt_batching:
+    # Decoding and clips too long to batch run on the STT pool, not the event loop
+    voice_bot.stt.executor = scheduler.executor("stt")
+    QUEUE_DEPTH.track(voice_bot.stt.batcher.queue_depth, queue="stt_batcher")
+ACTIVE_SESSIONS.track(lambda: len(voice_bot.llm.conversations), kind="conversations")
+
+
+def busy_message(error: SchedulerBusy):
+    return {
+        "type": "busy",
+        "stage": error.stage,
+        "retry_after": scheduler.busy_retry_after,
+        "message": "The server is busy. Please try again shortly."
+    }
+
+
+async def respond_to_transcription(transcription, session_id=None):
+    """Run LLM -> TTS for a finished transcript on the inference pools"""
+    result = await scheduler.run_async("llm", voice_bot.analyze_async, transcription, session_id)
+    if session_id:
+        fusion_engine.record_voice(session_id, result["is_depressed"], result["confidence"])
+    audio_response = await scheduler.run("tts", voice_bot.synthesize, result["response"])
+    return result["is_depressed"], result["confidence"], result["response"], audio_response
+
+
+async def transcribe_clip(audio_bytes):
+    """STT for a whole clip: batched across sessions when enabled, else on the STT pool"""
+    if voice_bot.stt_batching:
+        return await scheduler.run_async("stt", voice_bot.transcribe_bytes_async, audio_bytes)
+    return await scheduler.run("stt", voice_bot.transcribe_bytes, audio_bytes)
+
+
+async def transcribe_segment(segment, context):
+    """STT for one streamed VAD segment, with the earlier segments as prompt"""
+    if voice_bot.stt_batching:
+        return await scheduler.run_async("stt", voice_bot.transcribe_segment_async, segment, context)
+    return await scheduler.run("stt", voice_bot.transcribe_segment, segment, context)
+
+
+async def stream_reply(connection: VoiceConnection, transcription, session_id=None):
+    """Stream LLM -> sentence-level TTS, sending each sentence's audio as soon as it is ready.
+
+    Sentences are synthesized concurrently on the TTS pool while the LLM is
+    still generating, but sent strictly in order. The classification fields
+    follow in a final "ai_response" frame.
+    """
+    start = time.perf_counter()
+    pending = asyncio.Queue()
+    result = {}
+    first_audio = None
+
+    async def produce():
+        async for kind, value in voice_bot.stream_analysis(transcription, session_id):
+            if kind == "sentence":
+                task = asyncio.ensure_future(scheduler.run("tts", voice_bot.synthesize, value))
+                pending.put_nowait((value, task))
+            else:
+                result.update(value)
+
+    async def send_in_order():
+        nonlocal first_audio
+        seq = 0
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            sentence, task = item
+            audio = await task
+            if not audio:
+                continue
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+                first_audio_latencies.append(first_audio)
+            await connection.send({"type": "response_audio", "seq": seq, "text": sentence}, audio,
+                                  voice_bot.tts.audio_format)
+            seq += 1
+
+    sender = asyncio.create_task(send_in_order())
+    try:
+        try:
+            await scheduler.run_async("llm", produce)
+        finally:
+            pending.put_nowait(None)
+        await sender
+    except BaseException:
+        sender.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None:
+                item[1].cancel()
+        raise
+
+    if session_id and result:
+        fusion_engine.record_voice(session_id, result["is_depressed"], result["confidence"])
+    await connection.send({
+        "type": "ai_response",
+        "streamed": True,
+        "text_response": result.get("response", ""),
+        "is_depressed": result.get("is_depressed", False),
+        "confidence_score": result.get("confidence", 0.0),
+        "transcription": transcription,
+        "first_audio_ms": round(first_audio * 1000, 1) if first_audio is not None else None
+    })
+
+
+async def run_voice_pipeline(audio_bytes, session_id=None):
+    """Run STT -> LLM -> TTS on the inference pools without blocking the event loop.
+
+    Returns the same tuple as ``VoiceBot.process_audio_for_depression``.
+    ``SchedulerBusy`` is propagated so the caller can tell the client to back off.
+    """
+    try:
+        transcription = await transcribe_clip(audio_bytes)
+        if not transcription:
+            return False, 0.5, "Audio could not be understood.", b""
+
+        return await respond_to_transcription(transcription, session_id)
+    except SchedulerBusy:
+        raise
+    except Exception:
+        logger.exception("Voice pipeline failed")
+        ERRORS.inc(component="voice_pipeline", reason="exception")
+        return False, 0.5, "Error analyzing depression status.", b""
+
+
+class TranscriptStream:
+    """Incremental transcription for one streaming utterance.
+
+    PCM chunks go through the VAD as they arrive; each speech segment is
+    transcribed in order on the STT pool and pushed back as a partial
+    transcript. As soon as end of speech is detected the joined transcript
+    goes to the LLM, so the reply waits for roughly one segment of decoding
+    rather than the whole clip.
+    """
+
+    def __init__(self, connection: VoiceConnection, session_id: str, stream_response: bool = False):
+        self.connection = connection
+        self.session_id = session_id
+        self.stream_response = stream_response
+        self.segmenter = SpeechSegmenter()
+        self.queue = asyncio.Queue()
+        self.texts = []
+        self.worker = asyncio.create_task(self._run())
+
+    def feed(self, chunk: bytes):
+        for event in self.segmenter.feed(chunk):
+            self.queue.put_nowait(event)
+
+    async def finish(self):
+        """Flush the remaining audio and wait until the last reply has been sent"""
+        self.queue.put_nowait(self.segmenter.flush())
+        self.queue.put_nowait(None)
+        await self.worker
+
+    async def _run(self):
+        while True:
+            event = await self.queue.get()
+            if event is None:
+                return
+            segment, end_of_speech = event
+            try:
+                if segment is not None:
+                    await self._transcribe(segment)
+                if end_of_speech and self.texts:
+                    await self._respond()
+            except SchedulerBusy as e:
+                logger.warning(f"Dropping streamed audio for session {self.session_id}: {e}")
+                await self.connection.send(busy_message(e))
+            except Exception:
+                logger.exception("Streaming transcription failed")
+                await self.connection.send({"type": "error", "message": "Internal server error"})
+
+    async def _transcribe(self, segment):
+        context = " ".join(self.texts)
+        text = await transcribe_segment(segment, context)
+        if not text:
+            return
+        self.texts.append(text)
+        await self.connection.send({
+            "type": "partial_transcript",
+            "text": text,
+            "transcript": " ".join(self.texts)
+        })
+
+    async def _respond(self):
+        transcription = " ".join(self.texts)
+        self.texts = []
+        logger.info(f"End of speech for session {self.session_id}: '{transcription}'")
+        if self.stream_response:
+            await stream_reply(self.connection, transcription, self.session_id)
+            return
+        is_depressed, confidence, response_text, audio_response = await respond_to_transcription(transcription, self.session_id)
+        await self.connection.send({
+            "type": "ai_response",
+            "text_response": response_text,
+            "is_depressed": is_depressed,
+            "confidence_score": confidence,
+            "transcription": transcription
+        }, audio_response, voice_bot.tts.audio_format)
+
 
 @router.websocket("/ws/conversation/{session_id}")
 async def websocket_conversation(websocket: WebSocket, session_id: str):
     await websocket.accept()
     logger.info(f"WebSocket connected for session: {session_id}")
-    
+    connection = VoiceConnection(websocket)
+    ACTIVE_SESSIONS.inc(kind="voice_ws")
+    try:
+        await _conversation_loop(connection, session_id)
+    finally:
+        ACTIVE_SESSIONS.dec(kind="voice_ws")
+
+
+async def _conversation_loop(connection: VoiceConnection, session_id: str):
+    stream = None
+
     while True:
         try:
-            data = await websocket.receive_json()
+            data, decoded_audio = await connection.receive()
+
+            if data.get("type") == "audio_chunk":
+                if stream is not None:
+                    stream.feed(decoded_audio)
+                continue
+
             logger.info(f"Received WebSocket message: {data.get('type')}")
-            
+
+            if data.get("type") == "stream_start":
+                if stream is not None:
+                    await stream.finish()
+                stream = TranscriptStream(connection, session_id, connection.wants_streamed_reply(data))
+                continue
+
+            if data.get("type") == "stream_end":
+                if stream is not None:
+                    await stream.finish()
+                    stream = None
+                continue
+
             if data.get("type") == "audio":
                 transcription = data.get("transcription", "")
                 logger.info(f"User said: '{transcription}'")
-                
-                # Save audio to temp file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmpfile:
-                    wav_path = tmpfile.name
-                
-                decoded_audio = base64.b64decode(data.get("audio", ""))
+
                 if not decoded_audio:
                     logger.warning("No audio data received")
                     continue
-                
-                with open(wav_path, "wb") as f:
-                    f.write(decoded_audio)
-                
-                # Process audio
-                is_depressed, confidence, response_text, audio_response = voice_bot.process_audio_for_depression(wav_path)
-                os.unlink(wav_path)
-                
+
+                if connection.wants_streamed_reply(data):
+                    try:
+                        transcription = await transcribe_clip(decoded_audio)
+                        if transcription:
+                            await stream_reply(connection, transcription, session_id)
+                        else:
+                            await connection.send({
+                                "type": "transcription_failed",
+                                "message": "Could not understand the audio. Please speak clearly and try again."
+                            })
+                    except SchedulerBusy as e:
+                        logger.warning(f"Rejecting audio for session {session_id}: {e}")
+                        await connection.send(busy_message(e))
+                    continue
+
+                # Process audio in memory on the inference pools
+                try:
+                    is_depressed, confidence, response_text, audio_response = await run_voice_pipeline(decoded_audio, session_id)
+                except SchedulerBusy as e:
+                    logger.warning(f"Rejecting audio for session {session_id}: {e}")
+                    await connection.send(busy_message(e))
+                    continue
+
                 if audio_response:
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "ai_response",
                         "text_response": response_text,
-                        "audio_response": base64.b64encode(audio_response).decode(),
                         "is_depressed": is_depressed,
                         "confidence_score": confidence,
                         "transcription": transcription
-                    })
+                    }, audio_response, voice_bot.tts.audio_format)
                 else:
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "transcription_failed",
                         "message": "Could not understand the audio. Please speak clearly and try again."
                     })
-                    
+
         except WebSocketDisconnect:
             logger.info(f"WebSocket disconnected for session: {session_id}")
+            if stream is not None:
+                stream.worker.cancel()
             break
         except Exception as e:
             logger.error(f"WebSocket error: {e}", exc_info=True)
-            await websocket.send_json({"type": "error", "message": "Internal server error"})
\ No newline at end of file
+            await connection.send({"type": "error", "message": "Internal server error"})
+
+
+@router.get("/stats")
+async def get_voice_stats():
+    """Inference queue depths, LLM/TTS cache metrics and streamed time-to-first-audio for this worker"""
+    latencies = sorted(first_audio_latencies)
+    return {
+        "status": "success",
+        "scheduler": scheduler.stats(),
+        "stt_batching": voice_bot.stt.batcher.stats.snapshot() if voice_bot.stt_batching else {"enabled": False},
+        "llm": async_llm_client.metrics.snapshot(),
+        "llm_cache": voice_bot.llm.cache_stats(),
+        "prescreen": voice_bot.llm.prescreen_stats(),
+        "tts_cache": voice_bot.tts.cache_stats(),
+        "first_audio_ms": {
+            "samples": len(latencies),
+            "p50": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None
+        }
+    }
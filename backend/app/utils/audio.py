@@ -0,0 +1,126 @@
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+WHISPER_SAMPLE_RATE = 16000
+
+_PCM_DTYPES = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo:
+    """Header fields of a RIFF/WAVE buffer and where its sample data lives"""
+
+    def __init__(self, audio_format, channels, sample_rate, sample_width, data_offset, data_size):
+        self.audio_format = audio_format
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (self.sample_width * self.channels)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def parse_wav_header(buffer) -> WavInfo:
+    """Walk the RIFF chunks of an in-memory WAV file without copying its samples"""
+    view = memoryview(buffer)
+    if len(view) < 12 or bytes(view[0:4]) != b"RIFF" or bytes(view[8:12]) != b"WAVE":
+        raise ValueError("not a RIFF/WAVE buffer")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate = struct.unpack_from("<HHI", view, body)
+            (bits_per_sample,) = struct.unpack_from("<H", view, body + 14)
+            if audio_format == _WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                (audio_format,) = struct.unpack_from("<H", view, body + 24)
+            fmt = (audio_format, channels, sample_rate, bits_per_sample // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            # Streaming writers may leave the size unset; clamp to what we have
+            data_size = min(chunk_size, len(view) - body)
+            return WavInfo(*fmt, data_offset=body, data_size=data_size)
+        offset = body + chunk_size + (chunk_size & 1)  # chunks are word aligned
+
+    raise ValueError("no data chunk found")
+
+
+def resample(samples: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """Resample mono float32 audio (linear interpolation); a no-op when the rates already match"""
+    if orig_rate == target_rate or len(samples) == 0:
+        return samples
+    if orig_rate % target_rate == 0:
+        # Integer ratio (48k/32k -> 16k): average each group, a cheap low-pass + decimate
+        factor = orig_rate // target_rate
+        usable = len(samples) - len(samples) % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1, dtype=np.float32)
+    target_len = int(round(len(samples) * target_rate / orig_rate))
+    positions = np.arange(target_len, dtype=np.float64) * (orig_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def wav_to_float32(buffer, info: Optional[WavInfo] = None,
+                   target_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Decode WAV bytes into the mono float32 array in [-1, 1] that Whisper expects"""
+    info = info or parse_wav_header(buffer)
+    width, channels = info.sample_width, info.channels
+    usable = info.frames * width * channels
+    raw = memoryview(buffer)[info.data_offset:info.data_offset + usable]
+
+    if info.audio_format == _WAVE_FORMAT_IEEE_FLOAT and width == 4:
+        pcm, offset, scale = np.frombuffer(raw, dtype="<f4"), 0.0, 1.0
+    elif info.audio_format == _WAVE_FORMAT_PCM and width in _PCM_DTYPES:
+        pcm = np.frombuffer(raw, dtype=_PCM_DTYPES[width])
+        if width == 1:  # 8-bit WAV is unsigned
+            offset, scale = 128.0, 1 / 128.0
+        else:
+            offset, scale = 0.0, 1 / float(2 ** (8 * width - 1))
+    else:
+        raise ValueError(f"unsupported WAV encoding (format {info.audio_format}, {8 * width}-bit)")
+
+    # One pass from the read-only view into a fresh float32 array, downmixing
+    # interleaved channels by summing them before scaling
+    if channels > 1:
+        samples = pcm.reshape(-1, channels).sum(axis=1, dtype=np.float32)
+    else:
+        samples = pcm.astype(np.float32)
+    if offset:
+        samples -= offset * channels
+    samples *= scale / channels
+
+    return resample(samples, info.sample_rate, target_rate)
+
+
+def validate_wav_bytes(buffer, min_duration: float, max_duration: float) -> Tuple[Optional[WavInfo], str]:
+    """Check a WAV buffer's header and duration; returns (info, error message)"""
+    if not buffer:
+        return None, "Audio data is empty"
+    try:
+        info = parse_wav_header(buffer)
+    except (ValueError, struct.error) as e:
+        return None, f"Invalid WAV file: {e}"
+
+    if info.sample_rate == 0 or info.channels == 0 or info.sample_width == 0:
+        return None, "Invalid WAV file: empty format header"
+
+    duration = info.duration
+    if duration < min_duration:
+        return None, f"Audio too short: {duration:.2f}s"
+    if duration > max_duration:
+        return None, f"Audio too long: {duration:.2f}s"
+    return info, ""
@@ -0,0 +1,182 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import DEPRESSION_ANALYSIS, FUSION_SETTINGS
+
+MODALITIES = ("voice", "video")
+
+
+class DecayedScore:
+    """Exponentially decayed running mean of one modality's scores.
+
+    ``weight`` and ``weighted_sum`` both decay with the configured half-life,
+    so the mean tracks recent events and ``weight`` says how much recent
+    evidence there is. Updating and reading are O(1).
+    """
+
+    __slots__ = ("half_life", "weight", "weighted_sum", "updated", "events")
+
+    def __init__(self, half_life: float):
+        self.half_life = half_life
+        self.weight = 0.0
+        self.weighted_sum = 0.0
+        self.updated = 0.0
+        self.events = 0
+
+    def _decay(self, now: float) -> float:
+        return math.pow(0.5, max(0.0, now - self.updated) / self.half_life)
+
+    def add(self, score: float, now: float, weight: float = 1.0) -> None:
+        factor = self._decay(now)
+        self.weight = self.weight * factor + weight
+        self.weighted_sum = self.weighted_sum * factor + weight * score
+        self.updated = now
+        self.events += 1
+
+    def evidence(self, now: float) -> float:
+        return self.weight * self._decay(now)
+
+    @property
+    def mean(self) -> Optional[float]:
+        # Decay scales sum and weight alike, so the mean only changes on add()
+        return self.weighted_sum / self.weight if self.weight else None
+
+
+class FusedSession:
+    __slots__ = ("scores", "last_active")
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.scores = {m: DecayedScore(settings["half_life_seconds"][m]) for m in MODALITIES}
+        self.last_active = time.monotonic()
+
+
+class FusionEngine:
+    """Combines a session's live voice and video scores into one fused score.
+
+    The voice and video sockets of a session report their results here as
+    they are produced; each modality keeps an exponentially decayed mean, and
+    the fused score weights the two by ``voice_weight``/``video_weight``,
+    scaled down while a modality has little recent evidence, so a silent
+    microphone or a lost face fades out instead of freezing its last value.
+    Each event is O(1) and the new snapshot is pushed to subscribers.
+
+    State is per worker: a session's voice and video sockets must reach the
+    same process (one worker, or sticky routing on the session id).
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings or FUSION_SETTINGS
+        self.max_sessions = self.settings["max_sessions"]
+        self.ttl = self.settings["session_ttl"]
+        self.weights = {
+            "voice": DEPRESSION_ANALYSIS["voice_weight"],
+            "video": DEPRESSION_ANALYSIS["video_weight"]
+        }
+        self._sessions: "OrderedDict[str, FusedSession]" = OrderedDict()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def record_voice(self, session_id: str, is_depressed: bool, confidence: float) -> Optional[Dict[str, Any]]:
+        """Add one analyzed utterance, weighted by its confidence.
+
+        Zero-confidence results (LLM failures) carry no evidence and are skipped.
+        """
+        confidence = min(1.0, max(0.0, float(confidence)))
+        if not confidence:
+            return self.get(session_id)
+        return self._record(session_id, "voice", 1.0 if is_depressed else 0.0, confidence)
+
+    def record_video(self, session_id: str, score: float) -> Dict[str, Any]:
+        """Add one classified frame's emotion-derived depression score"""
+        return self._record(session_id, "video", float(score))
+
+    def _record(self, session_id: str, modality: str, score: float, weight: float = 1.0) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or now - session.last_active > self.ttl:
+                session = FusedSession(self.settings)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.scores[modality].add(score, now, weight)
+            session.last_active = now
+            self._evict(now)
+            snapshot = self._snapshot(session_id, session, now)
+        self._publish(session_id, snapshot)
+        return snapshot
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if len(self._sessions) > self.max_sessions or now - session.last_active > self.ttl:
+                del self._sessions[session_id]
+            else:
+                break
+
+    def _snapshot(self, session_id: str, session: FusedSession, now: float) -> Dict[str, Any]:
+        modalities = {}
+        total_weight = fused = 0.0
+        for modality, score in session.scores.items():
+            if score.mean is None:
+                continue
+            evidence = score.evidence(now)
+            # Full weight once there is enough recent evidence, less as it fades
+            weight = self.weights[modality] * min(1.0, evidence / self.settings["full_evidence"][modality])
+            modalities[modality] = {
+                "score": round(score.mean, 3),
+                "evidence": round(evidence, 3),
+                "weight": round(weight, 3),
+                "events": score.events,
+                "age_seconds": round(now - score.updated, 1)
+            }
+            total_weight += weight
+            fused += weight * score.mean
+        return {
+            "session_id": session_id,
+            "fused_score": round(fused / total_weight, 3) if total_weight else None,
+            "modalities": modalities,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Current fused snapshot, with evidence decayed to now, or None for an unknown session"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or now - session.last_active > self.ttl:
+                return None
+            return self._snapshot(session_id, session, now)
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Queue receiving the session's snapshots; only the newest unread one is kept"""
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(session_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(session_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(session_id, None)
+
+    def _publish(self, session_id: str, snapshot: Dict[str, Any]) -> None:
+        # Called from the event loop, like the socket handlers that record events
+        for queue in self._subscribers.get(session_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values())
+        }
+
+
+fusion_engine = FusionEngine()
@@ -0,0 +1,112 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import INFERENCE_SETTINGS
+from app.utils.metrics import ERRORS
+
+logger = logging.getLogger("DepressionDetection")
+
+
+class SchedulerBusy(Exception):
+    """Raised when a stage already has as much queued work as it accepts"""
+
+    def __init__(self, stage: str, depth: int):
+        super().__init__(f"Stage '{stage}' is busy ({depth} jobs pending)")
+        self.stage = stage
+        self.depth = depth
+
+
+class _Stage:
+    """A bounded worker pool for one step of the inference pipeline"""
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"inference-{name}"
+        )
+
+
+class InferenceScheduler:
+    """Runs blocking model/network calls off the event loop.
+
+    Each stage (stt, llm, tts) gets its own thread pool so a slow Groq
+    round-trip never holds up Whisper and vice versa. Whisper and gTTS
+    release the GIL while they work, so threads are enough to keep the
+    event loop responsive. A stage rejects new work with ``SchedulerBusy``
+    once ``workers + max_queue`` jobs are pending instead of letting
+    latency grow without limit.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or INFERENCE_SETTINGS
+        self.busy_retry_after = settings.get("busy_retry_after", 2.0)
+        self.stages = {
+            name: _Stage(name, cfg["workers"], cfg["max_queue"])
+            for name, cfg in settings.items()
+            if isinstance(cfg, dict)
+        }
+
+    async def run(self, stage: str, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` on the pool for ``stage`` and await its result"""
+        pool = self.stages[stage]
+        with pool.lock:
+            if pool.pending >= pool.max_pending:
+                ERRORS.inc(component="scheduler", reason=f"{stage}_busy")
+                raise SchedulerBusy(stage, pool.pending)
+            pool.pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                pool.executor, functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            with pool.lock:
+                pool.pending -= 1
+
+    async def run_async(self, stage: str, func: Callable, *args, **kwargs) -> Any:
+        """Await a coroutine function under the stage's admission limit.
+
+        For stages backed by an async client (e.g. the LLM) the work already
+        runs on the event loop; this only applies the same queue-depth
+        backpressure as ``run``.
+        """
+        pool = self.stages[stage]
+        with pool.lock:
+            if pool.pending >= pool.max_pending:
+                ERRORS.inc(component="scheduler", reason=f"{stage}_busy")
+                raise SchedulerBusy(stage, pool.pending)
+            pool.pending += 1
+
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            with pool.lock:
+                pool.pending -= 1
+
+    def executor(self, stage: str) -> ThreadPoolExecutor:
+        """The stage's thread pool, for blocking steps of work already admitted by ``run_async``"""
+        return self.stages[stage].executor
+
+    def queue_depth(self, stage: str) -> int:
+        """Number of jobs running or waiting on a stage"""
+        return self.stages[stage].pending
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"pending": pool.pending, "max_pending": pool.max_pending}
+            for name, pool in self.stages.items()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self.stages.values():
+            pool.executor.shutdown(wait=wait)
+        logger.info("Inference scheduler shut down")
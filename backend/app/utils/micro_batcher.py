@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger("DepressionDetection")
+
+
+class BatchStats:
+    """Running batch-size and queue-wait statistics for a MicroBatcher"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.last_batch_size = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_inference = 0.0
+
+    def record(self, batch_size: int, waits: List[float], inference_time: float) -> None:
+        with self.lock:
+            self.batches += 1
+            self.items += batch_size
+            self.last_batch_size = batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.total_wait += sum(waits)
+            self.max_wait = max(self.max_wait, max(waits))
+            self.total_inference += inference_time
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            batches = self.batches or 1
+            items = self.items or 1
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / batches, 2),
+                "max_batch_size": self.max_batch_size,
+                "last_batch_size": self.last_batch_size,
+                "avg_queue_wait_ms": round(self.total_wait / items * 1000, 3),
+                "max_queue_wait_ms": round(self.max_wait * 1000, 3),
+                "avg_inference_ms": round(self.total_inference / batches * 1000, 3)
+            }
+
+
+class MicroBatcher:
+    """Collects concurrent requests into batches for one model call.
+
+    Callers ``await submit(item)``. The first item in an empty queue opens a
+    collection window; the batch is flushed when the window expires or
+    ``max_batch_size`` items are waiting. ``process_fn`` receives the list of
+    items and returns one result per item, in order. It runs on a single
+    dedicated thread so the event loop stays free while the model works.
+    """
+
+    def __init__(self, process_fn: Callable[[List[Any]], List[Any]],
+                 window_ms: float = 8, max_batch_size: int = 32, name: str = "batcher"):
+        self.process_fn = process_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self.stats = BatchStats()
+        self._queue = None
+        self._worker = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item for the next batch and wait for its result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            waits = [started - queued_at for _, _, queued_at in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.process_fn, [item for item, _, _ in batch]
+                )
+            except Exception as e:
+                logger.exception(f"Batched inference failed ({self.name})")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.record(len(batch), waits, time.perf_counter() - started)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def shutdown(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+        self._executor.shutdown(wait=False)
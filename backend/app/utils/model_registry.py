@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("DepressionDetection")
+
+
+class ModelRegistry:
+    """Process-wide registry of lazily loaded models.
+
+    Modules register a loader (and optionally a warmup function) under a
+    name at import time; nothing heavy is imported or loaded until the
+    first ``get``. Each model is loaded at most once per process, even when
+    several threads ask for it at the same time.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._warmups: Dict[str, Callable[[Any], None]] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.load_times: Dict[str, float] = {}
+        self.warmup_times: Dict[str, float] = {}
+
+    def register(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], None]] = None) -> None:
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            if warmup is not None:
+                self._warmups[name] = warmup
+
+    def get(self, name: str) -> Any:
+        """Return the shared instance, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                logger.info(f"Loading model '{name}'...")
+                start = time.perf_counter()
+                model = self._loaders[name]()
+                self.load_times[name] = time.perf_counter() - start
+                self._models[name] = model
+                logger.info(f"Model '{name}' loaded in {self.load_times[name]:.2f}s")
+        return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> None:
+        """Load models eagerly and run a dummy inference so the first request isn't slow"""
+        for name in list(names) if names is not None else list(self._loaders):
+            if name not in self._loaders:
+                logger.warning(f"Skipping warmup of unregistered model '{name}'")
+                continue
+            model = self.get(name)
+            warmup = self._warmups.get(name)
+            if warmup is None:
+                continue
+            start = time.perf_counter()
+            try:
+                warmup(model)
+            except Exception:
+                logger.exception(f"Warmup of model '{name}' failed")
+                continue
+            self.warmup_times[name] = time.perf_counter() - start
+            logger.info(f"Model '{name}' warmed up in {self.warmup_times[name]:.2f}s")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_seconds": round(self.load_times.get(name, 0.0), 3),
+                "warmup_seconds": round(self.warmup_times.get(name, 0.0), 3)
+            }
+            for name in self._loaders
+        }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,23 @@
+from typing import Callable, List
+
+import numpy as np
+
+from app.utils.micro_batcher import MicroBatcher
+
+
+class EmotionBatcher(MicroBatcher):
+    """Micro-batches face crops from all live video sessions into one forward pass.
+
+    Callers ``await submit(face)`` with a preprocessed 48x48x1 face and get
+    back its emotion label; the faces of one batch are stacked into a single
+    array for ``predict_fn``.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], List[str]],
+                 window_ms: float = 8, max_batch_size: int = 32):
+        super().__init__(
+            lambda faces: predict_fn(np.stack(faces)),
+            window_ms=window_ms,
+            max_batch_size=max_batch_size,
+            name="emotion-batcher"
+        )
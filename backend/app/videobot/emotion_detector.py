@@ -1,32 +1,86 @@
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
-from config import FACE_MODEL_PATH  # Add this import at the top
+from app.utils.model_registry import registry
+from app.utils.metrics import STAGE_SECONDS
+from .face_engines import INPUT_SHAPE, create_face_engine
+from .face_tracker import FaceLocator
+
+
+def warmup_face_model(engine):
+    engine.predict(np.zeros((1,) + INPUT_SHAPE, dtype=np.float32))
+
+
+# The runtime (TensorFlow, ONNX Runtime or TFLite) is imported by the engine,
+# so it is only paid for by workers that analyze video
+registry.register("face", create_face_engine, warmup_face_model)
+
+# Output order of face_model.h5; the lowercased names are the emotion ids used in session aggregates
+CLASS_NAMES = ['Angry', 'Disgusted', 'Fear', 'Happy', 'Sad', 'Surprise', 'Neutral']
+EMOTION_LABELS = [name.lower() for name in CLASS_NAMES]
+
 
 class EmotionDetector:
     def __init__(self):
-        self.model = load_model(FACE_MODEL_PATH)  # Use from config.py
-        self.class_names = ['Angry', 'Disgusted', 'Fear', 'Happy', 'Sad', 'Surprise', 'Neutral']
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
+        self.class_names = CLASS_NAMES
+        self.face_locator = FaceLocator()
+
+    @property
+    def model(self):
+        return registry.get("face")
+
+    def extract_face(self, frame, track=None):
+        """Find the first face in a BGR frame and return it as a 48x48x1 model input, or None.
+
+        Pass the session's ``FaceTrack`` to use the skip-frame tracking mode.
+        """
+        with STAGE_SECONDS.time(stage="face_detect"):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            box = self.face_locator.locate(gray, track)
+
+        if box is None:
+            return None
+        return self.preprocess(frame, [box])[0]
+
+    def extract_faces(self, frame, track=None, max_faces=None):
+        """Find every face in a BGR frame; returns (boxes, (N, 48, 48, 1) model inputs).
+
+        Faces are ordered largest first and capped at ``max_faces``.
+        """
+        with STAGE_SECONDS.time(stage="face_detect"):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            boxes = self.face_locator.locate_all(gray, track)
+
+        boxes = sorted(boxes, key=lambda box: box[2] * box[3], reverse=True)[:max_faces]
+        return boxes, self.preprocess(frame, boxes)
+
+    @staticmethod
+    def preprocess(frame, boxes):
+        """Crop and resize each box, then convert the whole stack to model inputs at once"""
+        if not len(boxes):
+            return np.empty((0, 48, 48, 1), dtype=np.float32)
+        crops = np.empty((len(boxes), 48, 48, 3), dtype=np.uint8)
+        for i, (x, y, w, h) in enumerate(boxes):
+            crops[i] = cv2.resize(frame[y:y+h, x:x+w], (48, 48))
+        # One color conversion for all faces, with the stack viewed as a single (N*48)x48 image
+        gray = cv2.cvtColor(crops.reshape(-1, 48, 3), cv2.COLOR_BGR2GRAY)
+        return gray.reshape(-1, 48, 48, 1).astype(np.float32)  # same values as Keras img_to_array
+
+    def predict_batch(self, faces):
+        """Classify a stacked (N, 48, 48, 1) batch of faces in a single forward pass"""
+        with STAGE_SECONDS.time(stage="emotion_predict"):
+            predictions = self.model.predict(np.asarray(faces, dtype=np.float32))
+        return [self.class_names[i].lower() for i in np.argmax(predictions, axis=1)]
 
     def detect_emotion(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
-        
-        if len(faces) == 0:
+        face_img = self.extract_face(frame)
+        if face_img is None:
             return "neutral"
-        
-        (x, y, w, h) = faces[0]  # Process only the first face
-        face_roi = frame[y:y+h, x:x+w]
-        
-        # Preprocess for model
-        face_img = cv2.resize(face_roi, (48, 48))
-        face_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
-        face_img = image.img_to_array(face_img)
-        face_img = np.expand_dims(face_img, axis=0)
-        
-        predictions = self.model.predict(face_img)
-        return self.class_names[np.argmax(predictions)].lower()  # Match your existing emotion format
\ No newline at end of file
+
+        return self.predict_batch(np.expand_dims(face_img, axis=0))[0]  # Match your existing emotion format
+
+    def detect_emotions(self, frame, track=None, max_faces=None):
+        """Classify every face in a frame with one model call; returns (box, emotion) pairs, largest first"""
+        boxes, faces = self.extract_faces(frame, track, max_faces)
+        if not boxes:
+            return []
+        return list(zip(boxes, self.predict_batch(faces)))
@@ -0,0 +1,121 @@
+"""Export face_model.h5 for the lightweight face engines and check parity.
+
+Writes an ONNX file (for ONNX Runtime) and/or a TFLite flatbuffer next to
+the Keras model, at the paths FACE_MODEL_SETTINGS reads, then runs the
+same batch through Keras and every exported model and compares the softmax
+outputs. Exits non-zero if an export drifts past ``--atol`` or predicts a
+different class on more inputs than ``--min-agreement`` allows. TensorFlow
+(and tf2onnx for ONNX) is needed here only, not in the serving workers.
+
+    python -m app.videobot.export_face_model --formats onnx tflite
+    python -m app.videobot.export_face_model --formats onnx --faces-video session.mp4
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Same import layout as main.py: ``app.*`` from backend/, ``config`` from app/
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+for path in (BACKEND_DIR, BACKEND_DIR / "app"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from config import FACE_MODEL_PATH, FACE_MODEL_SETTINGS  # noqa: E402
+from app.videobot.face_engines import INPUT_SHAPE, KerasFaceEngine, create_face_engine  # noqa: E402
+
+FORMATS = ("onnx", "tflite")
+
+
+def export_onnx(model, path: Path, opset: int = 13) -> None:
+    import tensorflow as tf
+    import tf2onnx
+    # Dynamic batch dimension, so one file serves any micro-batch size
+    signature = [tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name="face")]
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=str(path))
+
+
+def export_tflite(model, path: Path, quantize: bool = False) -> None:
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        # Dynamic-range int8 weights; ~4x smaller, needs a looser --atol
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    path.write_bytes(converter.convert())
+
+
+def parity_faces(count: int, video: Optional[str] = None) -> np.ndarray:
+    """Real face crops from a video when given, else random 0-255 pixels"""
+    if video:
+        import cv2
+        from app.videobot.emotion_detector import EmotionDetector
+        detector = EmotionDetector()
+        capture = cv2.VideoCapture(video)
+        faces = []
+        while len(faces) < count:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            face = detector.extract_face(frame)
+            if face is not None:
+                faces.append(face)
+        capture.release()
+        if faces:
+            return np.stack(faces)
+        print(f"No faces found in {video}; using random inputs", file=sys.stderr)
+    rng = np.random.default_rng(0)
+    return rng.uniform(0, 255, (count,) + INPUT_SHAPE).astype(np.float32)
+
+
+def check_parity(reference: np.ndarray, engine, faces: np.ndarray) -> dict:
+    # Batch sizes 1 and N both go through the engine, as they do when serving
+    output = np.concatenate([engine.predict(faces[:1]), engine.predict(faces[1:])]) if len(faces) > 1 \
+        else engine.predict(faces)
+    return {
+        "max_abs_diff": float(np.max(np.abs(output - reference))),
+        "argmax_agreement": float(np.mean(np.argmax(output, axis=1) == np.argmax(reference, axis=1)))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--source", default=str(FACE_MODEL_PATH), help="Keras .h5 model")
+    parser.add_argument("--onnx-path", default=str(FACE_MODEL_SETTINGS["onnx_path"]))
+    parser.add_argument("--tflite-path", default=str(FACE_MODEL_SETTINGS["tflite_path"]))
+    parser.add_argument("--opset", type=int, default=13)
+    parser.add_argument("--quantize", action="store_true", help="dynamic-range int8 TFLite weights")
+    parser.add_argument("--samples", type=int, default=256, help="inputs for the parity check")
+    parser.add_argument("--faces-video", help="take parity inputs from faces in this video")
+    parser.add_argument("--atol", type=float, default=1e-4, help="allowed max abs softmax difference")
+    parser.add_argument("--min-agreement", type=float, default=1.0,
+                        help="required fraction of inputs with the same predicted class")
+    parser.add_argument("--skip-check", action="store_true")
+    args = parser.parse_args()
+
+    keras_engine = KerasFaceEngine(Path(args.source))
+    paths = {"onnx": Path(args.onnx_path), "tflite": Path(args.tflite_path)}
+    for fmt in args.formats:
+        if fmt == "onnx":
+            export_onnx(keras_engine.model, paths[fmt], args.opset)
+        else:
+            export_tflite(keras_engine.model, paths[fmt], args.quantize)
+        print(f"Wrote {paths[fmt]} ({paths[fmt].stat().st_size / 1024:.0f} KiB)", file=sys.stderr)
+    if args.skip_check:
+        return
+
+    faces = parity_faces(args.samples, args.faces_video)
+    reference = keras_engine.predict(faces)
+    report = {fmt: check_parity(reference, create_face_engine(fmt, paths[fmt]), faces) for fmt in args.formats}
+    print(json.dumps({"samples": len(faces), "atol": args.atol, "parity": report}, indent=2))
+    failed = [fmt for fmt, result in report.items()
+              if result["max_abs_diff"] > args.atol or result["argmax_agreement"] < args.min_agreement]
+    if failed:
+        sys.exit(f"Parity check failed for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
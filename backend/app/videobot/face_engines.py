@@ -0,0 +1,124 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import FACE_MODEL_PATH, FACE_MODEL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Input of face_model.h5: grayscale 48x48 crops, raw 0-255 pixel values
+INPUT_SHAPE = (48, 48, 1)
+
+
+class FaceEmotionEngine:
+    """One inference backend for the 48x48 face emotion CNN.
+
+    ``predict`` takes a float32 (N, 48, 48, 1) batch and returns the (N, 7)
+    softmax output in ``CLASS_NAMES`` order, whatever runtime produced it.
+    """
+
+    name = "base"
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class KerasFaceEngine(FaceEmotionEngine):
+    """The reference Keras model from face_model.h5 (imports all of TensorFlow)"""
+
+    name = "keras"
+
+    def __init__(self, path: Path = FACE_MODEL_PATH, threads: int = 0):
+        import tensorflow as tf
+        if threads:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        self.model = tf.keras.models.load_model(path)
+
+    def predict(self, faces):
+        return np.asarray(self.model.predict_on_batch(faces))
+
+
+class OnnxFaceEngine(FaceEmotionEngine):
+    """The exported model on ONNX Runtime's CPU provider"""
+
+    name = "onnx"
+
+    def __init__(self, path: Path, threads: int = 0):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, faces):
+        return self.session.run(None, {self.input_name: faces})[0]
+
+
+def _tflite_interpreter_class():
+    """Smallest installed TFLite interpreter: LiteRT, tflite-runtime, then full TensorFlow"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class TFLiteFaceEngine(FaceEmotionEngine):
+    """The exported model on a TFLite interpreter.
+
+    The interpreter has fixed tensor shapes, so the input is resized when
+    the batch size changes; batches of one size in a row reuse the tensors.
+    An interpreter is not thread-safe, so calls are serialized.
+    """
+
+    name = "tflite"
+
+    def __init__(self, path: Path, threads: int = 0):
+        interpreter_class = _tflite_interpreter_class()
+        self.interpreter = interpreter_class(model_path=str(path), num_threads=threads or None)
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.batch_size = None
+        self.lock = threading.Lock()
+
+    def predict(self, faces):
+        with self.lock:
+            if faces.shape[0] != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, faces.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = faces.shape[0]
+            self.interpreter.set_tensor(self.input_index, faces)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+
+def create_face_engine(backend: Optional[str] = None, path: Optional[Path] = None) -> FaceEmotionEngine:
+    """Build the engine selected by FACE_MODEL_SETTINGS (each argument overrides its setting)"""
+    backend = backend or FACE_MODEL_SETTINGS["backend"]
+    threads = FACE_MODEL_SETTINGS["threads"]
+
+    if backend == "keras":
+        return KerasFaceEngine(path or FACE_MODEL_PATH, threads)
+    if backend in ("onnx", "tflite"):
+        path = Path(path or FACE_MODEL_SETTINGS[f"{backend}_path"])
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; export it with "
+                                    f"`python -m app.videobot.export_face_model --formats {backend}`")
+        engine_class = OnnxFaceEngine if backend == "onnx" else TFLiteFaceEngine
+        logger.info(f"Face model: {backend} engine on {path}")
+        return engine_class(path, threads)
+    raise ValueError(f"Unknown face model backend: {backend}")
@@ -0,0 +1,171 @@
+import threading
+
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from config import VIDEO_SETTINGS
+
+Box = Tuple[int, int, int, int]
+
+
+def iou(a: Box, b: Box) -> float:
+    """Intersection-over-union of two (x, y, w, h) boxes"""
+    ax1, ay1, bx1, by1 = a[0] + a[2], a[1] + a[3], b[0] + b[2], b[1] + b[3]
+    inter_w = max(0, min(ax1, bx1) - max(a[0], b[0]))
+    inter_h = max(0, min(ay1, by1) - max(a[1], b[1]))
+    inter = inter_w * inter_h
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceIdentities:
+    """Stable ids for the faces of one session, by IoU matching across frames.
+
+    Each frame's boxes are matched greedily, highest overlap first, to the
+    boxes the known ids had last time; a pair only matches above
+    ``iou_threshold``. Unmatched boxes get a new id, and an id unseen for
+    more than ``max_missed`` frames is retired, so a person who leaves and
+    comes back is counted as someone new.
+    """
+
+    def __init__(self, iou_threshold=None, max_missed=None):
+        self.iou_threshold = iou_threshold if iou_threshold is not None else VIDEO_SETTINGS.get("face_id_iou", 0.3)
+        self.max_missed = max_missed if max_missed is not None else VIDEO_SETTINGS.get("face_id_max_missed", 5)
+        self.known: Dict[int, Tuple[Box, int]] = {}  # id -> (last box, frames missed since)
+        self.next_id = 1
+
+    def assign(self, boxes: List[Box]) -> List[int]:
+        """Return one id per box, in the order of ``boxes``"""
+        pairs = sorted(
+            ((iou(box, last), i, face_id)
+             for i, box in enumerate(boxes) for face_id, (last, _) in self.known.items()),
+            reverse=True
+        )
+        ids: List[Optional[int]] = [None] * len(boxes)
+        matched = set()
+        for overlap, i, face_id in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if ids[i] is None and face_id not in matched:
+                ids[i] = face_id
+                matched.add(face_id)
+
+        for face_id, (last, missed) in list(self.known.items()):
+            if face_id not in matched:
+                if missed >= self.max_missed:
+                    del self.known[face_id]
+                else:
+                    self.known[face_id] = (last, missed + 1)
+        for i, box in enumerate(boxes):
+            if ids[i] is None:
+                ids[i] = self.next_id
+                self.next_id += 1
+            self.known[ids[i]] = (box, 0)
+        return ids
+
+
+class FaceTrack:
+    """Per-session tracking state: the last face boxes, how old their full detection is, and face ids"""
+
+    def __init__(self):
+        self.box: Optional[Box] = None
+        self.boxes: List[Box] = []
+        self.frames_since_detection = 0
+        self.last_seen = 0.0
+        self.identities = FaceIdentities()
+
+
+class FaceLocator:
+    """Haar-cascade face finder with an optional skip-frame tracking mode.
+
+    In "full" mode every frame gets a full-frame ``detectMultiScale``. In
+    "tracking" mode a full (optionally downscaled) detection only runs every
+    ``detection_interval`` frames or when the track is lost; in between the
+    cascade only searches a padded region around the previous box, which is
+    a small fraction of a 640x480 frame.
+    """
+
+    def __init__(self, mode=None, detection_interval=None, detection_scale=None, tracking_margin=None):
+        self.mode = mode or VIDEO_SETTINGS.get("face_detection_mode", "full")
+        self.detection_interval = detection_interval or VIDEO_SETTINGS.get("detection_interval", 5)
+        self.detection_scale = detection_scale or VIDEO_SETTINGS.get("detection_scale", 1.0)
+        self.tracking_margin = tracking_margin if tracking_margin is not None else VIDEO_SETTINGS.get("tracking_margin", 0.25)
+        self._local = threading.local()
+
+    @property
+    def face_cascade(self):
+        # One classifier per thread: frames are located on several pool threads at once
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            cascade = self._local.cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+        return cascade
+
+    def detect(self, gray: np.ndarray, scale: float = 1.0):
+        """Full-frame detection, optionally on a downscaled copy of the image"""
+        if scale != 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            faces = self.face_cascade.detectMultiScale(small, scaleFactor=1.3, minNeighbors=5)
+            return [tuple(int(v / scale) for v in face) for face in faces]
+
+        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+        return [tuple(int(v) for v in face) for face in faces]
+
+    def _search_roi(self, gray: np.ndarray, box: Box) -> Optional[Box]:
+        """Look for the face again only in a padded window around its last position"""
+        x, y, w, h = box
+        pad_w, pad_h = int(w * self.tracking_margin), int(h * self.tracking_margin)
+        x0, y0 = max(0, x - pad_w), max(0, y - pad_h)
+        x1, y1 = min(gray.shape[1], x + w + pad_w), min(gray.shape[0], y + h + pad_h)
+
+        min_side = max(1, int(min(w, h) * 0.7))
+        faces = self.face_cascade.detectMultiScale(
+            gray[y0:y1, x0:x1], scaleFactor=1.3, minNeighbors=5, minSize=(min_side, min_side)
+        )
+        if len(faces) == 0:
+            return None
+
+        fx, fy, fw, fh = faces[0]
+        return (int(fx + x0), int(fy + y0), int(fw), int(fh))
+
+    def locate(self, gray: np.ndarray, track: Optional[FaceTrack] = None) -> Optional[Box]:
+        """Return the box of the face to analyze in this frame, or None"""
+        if self.mode != "tracking" or track is None:
+            faces = self.detect(gray, self.detection_scale)
+            return faces[0] if faces else None
+
+        track.frames_since_detection += 1
+        if track.box is not None and track.frames_since_detection < self.detection_interval:
+            box = self._search_roi(gray, track.box)
+            if box is not None:
+                track.box = box
+                return box
+            # Tracking confidence dropped: fall through to a full detection
+
+        faces = self.detect(gray, self.detection_scale)
+        track.box = faces[0] if faces else None
+        track.frames_since_detection = 0
+        return track.box
+
+    def locate_all(self, gray: np.ndarray, track: Optional[FaceTrack] = None) -> List[Box]:
+        """Return the boxes of every face in this frame.
+
+        In tracking mode each known face is searched for near its last box;
+        a full detection runs on schedule, when a face is lost, or when
+        there were none, which is also when newcomers are picked up.
+        """
+        if self.mode != "tracking" or track is None:
+            return self.detect(gray, self.detection_scale)
+
+        track.frames_since_detection += 1
+        if track.boxes and track.frames_since_detection < self.detection_interval:
+            boxes = [self._search_roi(gray, box) for box in track.boxes]
+            if all(box is not None for box in boxes):
+                track.boxes = boxes
+                return boxes
+
+        track.boxes = self.detect(gray, self.detection_scale)
+        track.frames_since_detection = 0
+        return track.boxes
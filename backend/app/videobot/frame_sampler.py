@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+from config import VIDEO_SETTINGS
+
+
+class LatestFrameSlot:
+    """Single-slot mailbox between a WebSocket reader and the analyzer.
+
+    ``put`` overwrites any frame the analyzer has not picked up yet and counts
+    it as dropped, so a fast client can never build a backlog: the analyzer
+    always sees the newest frame.
+    """
+
+    def __init__(self):
+        self._frame: Optional[bytes] = None
+        self._received_at = 0.0
+        self._error: Optional[BaseException] = None
+        self._event = asyncio.Event()
+        self.dropped_since_take = 0
+        self.total_dropped = 0
+        self.total_received = 0
+
+    def put(self, frame: bytes) -> None:
+        if self._frame is not None:
+            self.dropped_since_take += 1
+            self.total_dropped += 1
+        self._frame = frame
+        self._received_at = time.perf_counter()
+        self.total_received += 1
+        self._event.set()
+
+    def close(self, error: BaseException) -> None:
+        """Wake the analyzer with the reader's terminating exception"""
+        self._error = error
+        self._event.set()
+
+    async def take(self) -> Tuple[bytes, float, int]:
+        """Wait for the newest frame; returns (frame, received_at, dropped_since_last_take)"""
+        while self._frame is None:
+            if self._error is not None:
+                raise self._error
+            self._event.clear()
+            await self._event.wait()
+
+        frame, received_at, dropped = self._frame, self._received_at, self.dropped_since_take
+        self._frame = None
+        self.dropped_since_take = 0
+        return frame, received_at, dropped
+
+
+class AdaptiveSampler:
+    """Decides how long the analyzer waits before sampling the next frame.
+
+    With ``adaptive`` off the configured ``analysis_interval`` is used as is.
+    With it on, the interval stretches to ``headroom`` times the recent
+    (EWMA) analysis time when the server is slow, capped at
+    ``max_analysis_interval`` so results never get staler than that.
+    """
+
+    def __init__(self, interval=None, adaptive=None, max_interval=None, headroom=2.0, alpha=0.2):
+        self.interval = interval if interval is not None else VIDEO_SETTINGS.get("analysis_interval", 2)
+        self.adaptive = adaptive if adaptive is not None else VIDEO_SETTINGS.get("adaptive_sampling", True)
+        self.max_interval = max_interval or VIDEO_SETTINGS.get("max_analysis_interval", 5)
+        self.headroom = headroom
+        self.alpha = alpha
+        self.avg_processing = 0.0
+
+    def record(self, processing_time: float) -> None:
+        if self.avg_processing == 0.0:
+            self.avg_processing = processing_time
+        else:
+            self.avg_processing += self.alpha * (processing_time - self.avg_processing)
+
+    def current_interval(self) -> float:
+        if not self.adaptive:
+            return self.interval
+        return min(self.max_interval, max(self.interval, self.avg_processing * self.headroom))
+
+    def delay_until_next(self, started_at: float) -> float:
+        """Seconds to sleep so consecutive samples start one interval apart"""
+        return max(0.0, started_at + self.current_interval() - time.perf_counter())
@@ -0,0 +1,297 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import VIDEO_SETTINGS
+from .emotion_detector import EMOTION_LABELS
+
+EMOTION_IDS = {label: i for i, label in enumerate(EMOTION_LABELS)}
+
+
+class SessionAggregate:
+    """Fixed-size running summary of one video session.
+
+    Emotion counts live in an array indexed by emotion id, the depression
+    score is kept as a running sum, and an optional ring buffer of
+    ``trend_buckets`` time buckets keeps a recent per-bucket trend. Its size
+    never depends on how many frames the session has seen.
+    """
+
+    __slots__ = ("start_time", "last_frame_time", "total_samples", "score_sum",
+                 "counts", "bucket_seconds", "trend_head", "trend_counts", "trend_scores")
+
+    def __init__(self, start_time: float, bucket_seconds: float = 60, trend_buckets: int = 0):
+        self.start_time = start_time
+        self.last_frame_time = start_time
+        self.total_samples = 0
+        self.score_sum = 0.0
+        self.counts = np.zeros(len(EMOTION_LABELS), dtype=np.int64)
+        self.bucket_seconds = bucket_seconds
+        self.trend_head = -1
+        self.trend_counts = np.zeros(trend_buckets, dtype=np.int64)
+        self.trend_scores = np.zeros(trend_buckets, dtype=np.float64)
+
+    def add(self, emotion: str, score: float, now: float) -> None:
+        emotion_id = EMOTION_IDS.get(emotion)
+        if emotion_id is not None:
+            self.counts[emotion_id] += 1
+        self.total_samples += 1
+        self.score_sum += score
+        self.last_frame_time = now
+
+        size = len(self.trend_counts)
+        if size:
+            bucket = int((now - self.start_time) // self.bucket_seconds)
+            if bucket > self.trend_head:
+                # Clear the slots of buckets that passed without any frames
+                for stale in range(max(self.trend_head + 1, bucket - size + 1), bucket + 1):
+                    self.trend_counts[stale % size] = 0
+                    self.trend_scores[stale % size] = 0.0
+                self.trend_head = bucket
+            if bucket > self.trend_head - size:
+                self.trend_counts[bucket % size] += 1
+                self.trend_scores[bucket % size] += score
+
+    @property
+    def mean_score(self) -> float:
+        return self.score_sum / self.total_samples if self.total_samples else 0.5
+
+    def trend(self) -> List[Dict[str, Any]]:
+        size = len(self.trend_counts)
+        points = []
+        for bucket in range(max(0, self.trend_head - size + 1), self.trend_head + 1):
+            count = int(self.trend_counts[bucket % size])
+            if count:
+                points.append({
+                    "offset_seconds": bucket * self.bucket_seconds,
+                    "samples": count,
+                    "mean_score": round(float(self.trend_scores[bucket % size]) / count, 3)
+                })
+        return points
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start_time": self.start_time,
+            "last_frame_time": self.last_frame_time,
+            "total_samples": self.total_samples,
+            "counts": {EMOTION_LABELS[i]: int(c) for i, c in enumerate(self.counts) if c},
+            "mean_score": self.mean_score,
+            "trend": self.trend()
+        }
+
+    def to_row(self) -> tuple:
+        return (self.start_time, self.last_frame_time, self.total_samples, self.score_sum,
+                self.counts.tobytes(), self.trend_head, self.trend_counts.tobytes(),
+                self.trend_scores.tobytes())
+
+    @classmethod
+    def from_row(cls, row: tuple, bucket_seconds: float) -> "SessionAggregate":
+        start, last, total, score_sum, counts, head, trend_counts, trend_scores = row
+        aggregate = cls(start, bucket_seconds)
+        aggregate.last_frame_time = last
+        aggregate.total_samples = total
+        aggregate.score_sum = score_sum
+        aggregate.counts = np.frombuffer(counts, dtype=np.int64).copy()
+        aggregate.trend_head = head
+        aggregate.trend_counts = np.frombuffer(trend_counts, dtype=np.int64).copy()
+        aggregate.trend_scores = np.frombuffer(trend_scores, dtype=np.float64).copy()
+        return aggregate
+
+
+Sample = Tuple[str, float]  # (emotion, depression score)
+
+
+class SessionStore(ABC):
+    """Compact per-session emotion aggregates for video sessions.
+
+    Each session is one ``SessionAggregate``, so reading its results costs
+    the same no matter how long it has run, and sessions idle for longer
+    than ``ttl`` seconds are evicted. Backends other than the in-memory
+    default can be shared by several uvicorn workers, so
+    ``/results/{session_id}`` works from any of them.
+
+    Stores whose calls may block (disk I/O, lock waits) set ``blocking`` so
+    async callers run them off the event loop.
+    """
+
+    blocking = False
+
+    def __init__(self, ttl=None, bucket_seconds=None, trend_buckets=None):
+        self.ttl = ttl if ttl is not None else VIDEO_SETTINGS.get("session_ttl", 600)
+        self.bucket_seconds = bucket_seconds or VIDEO_SETTINGS.get("trend_bucket_seconds", 60)
+        self.trend_buckets = trend_buckets if trend_buckets is not None else VIDEO_SETTINGS.get("trend_buckets", 0)
+
+    def _new_aggregate(self, now: float) -> SessionAggregate:
+        return SessionAggregate(now, self.bucket_seconds, self.trend_buckets)
+
+    def record(self, session_id: str, emotion: str, score: float, timestamp: Optional[float] = None) -> None:
+        self.record_many(session_id, [(emotion, score)], timestamp)
+
+    @abstractmethod
+    def record_many(self, session_id: str, samples: Sequence[Sample], timestamp: Optional[float] = None) -> None:
+        """Add several samples taken at the same time (e.g. every face of a frame) in one update"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session's aggregate as a dict (see ``SessionAggregate.to_dict``) or None"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def session_ids(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Drop sessions with no frames for ``ttl`` seconds; returns their ids"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; the default for single-worker deployments"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sessions: Dict[str, SessionAggregate] = {}
+        self._lock = threading.Lock()
+
+    def record_many(self, session_id, samples, timestamp=None):
+        now = timestamp or time.time()
+        with self._lock:
+            aggregate = self._sessions.get(session_id)
+            if aggregate is None:
+                aggregate = self._sessions[session_id] = self._new_aggregate(now)
+            for emotion, score in samples:
+                aggregate.add(emotion, score, now)
+
+    def get(self, session_id):
+        with self._lock:
+            aggregate = self._sessions.get(session_id)
+            return aggregate.to_dict() if aggregate is not None else None
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def session_ids(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def evict_idle(self, now=None):
+        cutoff = (now or time.time()) - self.ttl
+        with self._lock:
+            idle = [sid for sid, agg in self._sessions.items() if agg.last_frame_time < cutoff]
+            for session_id in idle:
+                del self._sessions[session_id]
+        return idle
+
+
+class SQLiteSessionStore(SessionStore):
+    """On-disk store that every worker on a host can share (WAL mode, one row per session)"""
+
+    blocking = True
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS video_session_aggregates (
+            session_id TEXT PRIMARY KEY,
+            start_time REAL NOT NULL,
+            last_frame_time REAL NOT NULL,
+            total_samples INTEGER NOT NULL,
+            score_sum REAL NOT NULL,
+            counts BLOB NOT NULL,
+            trend_head INTEGER NOT NULL,
+            trend_counts BLOB NOT NULL,
+            trend_scores BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_video_session_last_frame
+            ON video_session_aggregates (last_frame_time);
+    """
+    COLUMNS = ("start_time, last_frame_time, total_samples, score_sum, counts, "
+               "trend_head, trend_counts, trend_scores")
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn, session_id) -> Optional[SessionAggregate]:
+        row = conn.execute(
+            f"SELECT {self.COLUMNS} FROM video_session_aggregates WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        return SessionAggregate.from_row(row, self.bucket_seconds) if row else None
+
+    def record_many(self, session_id, samples, timestamp=None):
+        now = timestamp or time.time()
+        conn = self._connection()
+        # Read-modify-write of one small row; IMMEDIATE serializes writers across workers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            aggregate = self._load(conn, session_id) or self._new_aggregate(now)
+            for emotion, score in samples:
+                aggregate.add(emotion, score, now)
+            conn.execute(
+                f"INSERT OR REPLACE INTO video_session_aggregates (session_id, {self.COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id,) + aggregate.to_row()
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, session_id):
+        aggregate = self._load(self._connection(), session_id)
+        return aggregate.to_dict() if aggregate is not None else None
+
+    def delete(self, session_id):
+        self._connection().execute(
+            "DELETE FROM video_session_aggregates WHERE session_id = ?", (session_id,)
+        )
+
+    def session_ids(self):
+        return [row[0] for row in self._connection().execute(
+            "SELECT session_id FROM video_session_aggregates"
+        )]
+
+    def evict_idle(self, now=None):
+        cutoff = (now or time.time()) - self.ttl
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            idle = [row[0] for row in conn.execute(
+                "SELECT session_id FROM video_session_aggregates WHERE last_frame_time < ?", (cutoff,)
+            )]
+            conn.execute("DELETE FROM video_session_aggregates WHERE last_frame_time < ?", (cutoff,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return idle
+
+
+def create_session_store(backend: Optional[str] = None, path: Optional[str] = None) -> SessionStore:
+    """Build the store selected by VIDEO_SETTINGS["session_store"] ("memory" or "sqlite")"""
+    backend = backend or VIDEO_SETTINGS.get("session_store", "memory")
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(path or VIDEO_SETTINGS["session_store_path"])
+    raise ValueError(f"Unknown session store backend: {backend}")
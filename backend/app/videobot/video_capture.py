@@ -1,12 +1,20 @@
+import asyncio
 import cv2
 import time
 import logging
 import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from collections import defaultdict, Counter
 from .emotion_detector import EmotionDetector
+from .emotion_batcher import EmotionBatcher
+from .face_tracker import FaceTrack
+from .session_store import SessionAggregate, create_session_store
+from .video_file import analyze_video_file, probe_video
+from app.utils.metrics import STAGE_SECONDS
+from config import VIDEO_SETTINGS
 
 logger = logging.getLogger("DepressionDetection")
 
@@ -38,40 +46,60 @@ class VideoCapture:
             
         self._initialized = True
         self.emotion_detector = EmotionDetector()
-        self.active_sessions = {}
+        self.batcher = None
+        if VIDEO_SETTINGS.get("batching_enabled", True):
+            self.batcher = EmotionBatcher(
+                self.emotion_detector.predict_batch,
+                window_ms=VIDEO_SETTINGS.get("batch_window_ms", 8),
+                max_batch_size=VIDEO_SETTINGS.get("max_batch_size", 32)
+            )
+        # Decoding, face detection and (unbatched) prediction block, so they run here
+        self.frame_executor = ThreadPoolExecutor(
+            max_workers=VIDEO_SETTINGS.get("frame_workers", 4), thread_name_prefix="video-frame"
+        )
+        self.session_store = create_session_store()
+        self.eviction_interval = VIDEO_SETTINGS.get("eviction_interval", 60)
+        self._last_eviction = time.time()
+        self.max_faces = VIDEO_SETTINGS.get("max_faces", 8)
+        self.max_people = VIDEO_SETTINGS.get("max_people_per_session", 32)
+        self.face_tracks = {}
+        self.people = {}  # session id -> {face id: SessionAggregate}
         self.lock = threading.Lock()
         logger.info("VideoCapture initialized with WebSocket support")
 
     async def process_frame(self, frame_data: bytes, session_id: str) -> Dict[str, Any]:
         """Process individual frames from WebSocket"""
         try:
-            # Decode frame
-            nparr = np.frombuffer(frame_data, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if frame is None:
+            loop = asyncio.get_running_loop()
+            extracted = await loop.run_in_executor(self.frame_executor, self._extract_faces, frame_data, session_id)
+            if extracted is None:
                 logger.error("Failed to decode WebSocket frame")
                 return {"error": "Invalid frame data"}
             
-            # Detect emotion
-            emotion = self.emotion_detector.detect_emotion(frame)
-            score = self.EMOTION_TO_DEPRESSION_SCORE.get(emotion, 0.5)
+            # Detect emotions of every face in the frame
+            faces = await self._classify(*extracted)
+            for face in faces:
+                face["score"] = self.EMOTION_TO_DEPRESSION_SCORE.get(face["emotion"], 0.5)
             
-            # Update session data
-            with self.lock:
-                if session_id not in self.active_sessions:
-                    self.active_sessions[session_id] = {
-                        "start_time": datetime.utcnow(),
-                        "emotions": [],
-                        "last_frame_time": None
-                    }
-                
-                self.active_sessions[session_id]["emotions"].append(emotion)
-                self.active_sessions[session_id]["last_frame_time"] = datetime.utcnow()
+            # Update session aggregates: every face counts towards the session
+            if faces:
+                samples = [(face["emotion"], face["score"]) for face in faces]
+                self._record_people(session_id, faces)
+                emotion = faces[0]["emotion"]
+                score = round(sum(face["score"] for face in faces) / len(faces), 3)
+            else:
+                emotion, score = "neutral", self.EMOTION_TO_DEPRESSION_SCORE["neutral"]
+                samples = [(emotion, score)]
+            # One store update per frame, off the event loop if the store can block
+            await self._store_call(self.session_store.record_many, session_id, samples)
+            if time.time() - self._last_eviction >= self.eviction_interval:
+                await self._store_call(self._evict_idle_sessions)
             
+            # "emotion" is the largest face's, "score" the mean over all faces
             return {
                 "emotion": emotion,
                 "score": score,
+                "faces": faces,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -79,39 +107,174 @@ class VideoCapture:
             logger.exception("Frame processing failed")
             return {"error": str(e)}
     
+    def _extract_faces(self, frame_data: bytes, session_id: str) -> Optional[Tuple[FaceTrack, list, np.ndarray]]:
+        """Decode a frame and find and preprocess its faces; blocking, runs on the frame pool.
+
+        Returns (track, boxes, crops), or None when the frame cannot be decoded.
+        """
+        with STAGE_SECONDS.time(stage="decode_frame"):
+            nparr = np.frombuffer(frame_data, np.uint8)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+
+        with self.lock:
+            track = self.face_tracks.setdefault(session_id, FaceTrack())
+            track.last_seen = time.time()
+        boxes, crops = self.emotion_detector.extract_faces(frame, track, self.max_faces)
+        return track, boxes, crops
+
+    async def _classify(self, track: FaceTrack, boxes: list, crops: np.ndarray) -> List[Dict[str, Any]]:
+        """Classify a frame's faces, batched with other sessions when enabled.
+
+        Returns one {"face_id", "box", "emotion"} dict per face, largest first.
+        """
+        if not boxes:
+            track.identities.assign([])
+            return []
+        if self.batcher is None:
+            emotions = await asyncio.get_running_loop().run_in_executor(
+                self.frame_executor, self.emotion_detector.predict_batch, crops
+            )
+        else:
+            # All faces of the frame join the same micro-batch
+            emotions = await asyncio.gather(*(self.batcher.submit(crop) for crop in crops))
+        face_ids = track.identities.assign(boxes)
+        return [
+            {"face_id": face_id, "box": [int(v) for v in box], "emotion": emotion}
+            for face_id, box, emotion in zip(face_ids, boxes, emotions)
+        ]
+
+    def _record_people(self, session_id: str, faces: List[Dict[str, Any]]) -> None:
+        """Add each face to its person's aggregate, keeping the most recent ``max_people``"""
+        now = time.time()
+        with self.lock:
+            people = self.people.setdefault(session_id, {})
+            for face in faces:
+                aggregate = people.get(face["face_id"])
+                if aggregate is None:
+                    if len(people) >= self.max_people:
+                        stale = min(people, key=lambda face_id: people[face_id].last_frame_time)
+                        del people[stale]
+                    aggregate = people[face["face_id"]] = SessionAggregate(now)
+                aggregate.add(face["emotion"], face["score"], now)
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Batch size and queue wait metrics for the shared emotion batcher"""
+        if self.batcher is None:
+            return {"enabled": False}
+        stats = self.batcher.stats.snapshot()
+        stats["enabled"] = True
+        stats["queue_depth"] = self.batcher.queue_depth()
+        return stats
+
+    async def _store_call(self, func, *args):
+        """Call into the session store, on a worker thread when its calls can block"""
+        if not self.session_store.blocking:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _evict_idle_sessions(self) -> None:
+        """Periodically drop sessions that stopped sending frames without disconnecting cleanly"""
+        now = time.time()
+        if now - self._last_eviction < self.eviction_interval:
+            return
+        self._last_eviction = now
+        evicted = self.session_store.evict_idle(now)
+        cutoff = now - self.session_store.ttl
+        with self.lock:
+            # Trackers are per worker, so expire them by their own last use
+            for session_id in [sid for sid, track in self.face_tracks.items() if track.last_seen < cutoff]:
+                del self.face_tracks[session_id]
+                self.people.pop(session_id, None)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle video sessions")
+
     def get_session_results(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get results for a session"""
+        session = self.session_store.get(session_id)
+        if not session:
+            return None
+
+        result = self._generate_result(session_id, session)
         with self.lock:
-            session = self.active_sessions.get(session_id)
-            if not session:
-                return None
-                
-            return self._generate_result(session_id, session["emotions"])
+            people = {face_id: aggregate.to_dict() for face_id, aggregate in self.people.get(session_id, {}).items()}
+        if people:
+            # Per-person aggregates live on the worker that served the session's socket
+            result["people"] = [self._person_result(face_id, person) for face_id, person in sorted(people.items())]
+        return result
     
+    def analyze_file(self, path: str, session_id: str, interval: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze a recorded video file; blocking, so run it off the event loop.
+
+        Returns the ``get_session_results`` shape plus a per-sample timeline.
+        The file's results are not added to any live session.
+        """
+        max_duration = VIDEO_SETTINGS["max_duration"]
+        info = probe_video(path)
+        if info["duration"] > max_duration:
+            raise ValueError(f"Video too long: {info['duration']:.0f}s (max {max_duration}s)")
+
+        # A header without a frame count reports duration 0, so sampling stops at the limit too
+        started = time.perf_counter()
+        analysis = analyze_video_file(path, self.emotion_detector, self.EMOTION_TO_DEPRESSION_SCORE, interval,
+                                      max_seconds=max_duration)
+        elapsed = time.perf_counter() - started
+        duration = info["duration"] or analysis["last_timestamp"]
+
+        result = self._generate_result(session_id, analysis["session"])
+        result["timeline"] = analysis["timeline"]
+        result["frames_analyzed"] = analysis["frames_analyzed"]
+        result["video_seconds"] = round(duration, 2)
+        result["processing_seconds"] = round(elapsed, 2)
+        if duration:
+            result["realtime_factor"] = round(elapsed / duration, 4)
+        return result
+
     def cleanup_session(self, session_id: str) -> None:
         """Clean up session resources"""
+        self.session_store.delete(session_id)
         with self.lock:
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
+            self.face_tracks.pop(session_id, None)
+            self.people.pop(session_id, None)
     
-    def _generate_result(self, session_id: str, emotions: list) -> Dict[str, Any]:
-        """Generate analysis results from emotion list"""
-        total_samples = len(emotions)
+    @classmethod
+    def _generate_result(cls, session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate analysis results from a session's emotion counts"""
+        counts = session["counts"]
+        total_samples = session["total_samples"]
         result = {
             "dominant_emotion": "neutral",
             "score": 0.5,
+            "mean_score": round(session["mean_score"], 3),
             "total_samples": total_samples,
             "session_id": session_id,
             "timestamp": datetime.utcnow().isoformat()
         }
+        if session["trend"]:
+            result["trend"] = session["trend"]
         
-        if emotions:
-            counter = Counter(emotions)
-            result["dominant_emotion"] = counter.most_common(1)[0][0]
+        if counts:
+            result["dominant_emotion"] = max(counts, key=counts.get)
             result["score"] = round(
-                self.EMOTION_TO_DEPRESSION_SCORE.get(
+                cls.EMOTION_TO_DEPRESSION_SCORE.get(
                     result["dominant_emotion"], 0.5
                 ), 2
             )
         
-        return result
\ No newline at end of file
+        return result
+
+    @classmethod
+    def _person_result(cls, face_id: int, person: Dict[str, Any]) -> Dict[str, Any]:
+        """Summary of one tracked face's aggregate, in the session result's terms"""
+        counts = person["counts"]
+        dominant = max(counts, key=counts.get) if counts else "neutral"
+        return {
+            "face_id": face_id,
+            "dominant_emotion": dominant,
+            "score": round(cls.EMOTION_TO_DEPRESSION_SCORE.get(dominant, 0.5), 2),
+            "mean_score": round(person["mean_score"], 3),
+            "total_samples": person["total_samples"],
+            "emotions": counts,
+            "seconds_tracked": round(person["last_frame_time"] - person["start_time"], 1)
+        }
\ No newline at end of file
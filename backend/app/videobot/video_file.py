@@ -0,0 +1,134 @@
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import VIDEO_SETTINGS
+from .session_store import SessionAggregate
+
+logger = logging.getLogger("DepressionDetection")
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+
+def probe_video(path: str) -> Dict[str, float]:
+    """Frame rate, frame count and duration from the container header (0 when unknown)"""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = max(0.0, capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0)
+    finally:
+        capture.release()
+    return {
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": frame_count / fps if fps else 0.0
+    }
+
+
+def sample_frames(path: str, interval: float,
+                  seek_min_interval: Optional[float] = None) -> Iterator[Tuple[float, np.ndarray]]:
+    """Yield (timestamp_seconds, BGR frame) every ``interval`` seconds of a video file.
+
+    Short intervals walk the stream with ``grab``, which decodes skipped
+    frames but never converts them to BGR. From ``seek_min_interval`` seconds
+    up, seeking to each sample (decoding from the previous keyframe) is
+    cheaper, so the file is seeked instead when its frame count is known.
+    """
+    if seek_min_interval is None:
+        seek_min_interval = VIDEO_SETTINGS.get("file_seek_min_interval", 10)
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        step = max(1, int(round(fps * interval)))
+
+        if frame_count > 0 and interval >= seek_min_interval:
+            for index in range(0, frame_count, step):
+                capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index / fps, frame
+            return
+
+        index = 0
+        while capture.grab():
+            if index % step == 0:
+                ok, frame = capture.retrieve()
+                if ok:
+                    yield index / fps, frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def analyze_video_file(path: str, detector, score_map: Dict[str, float],
+                       interval: Optional[float] = None, batch_size: Optional[int] = None,
+                       bucket_seconds: Optional[float] = None,
+                       max_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Classify sampled frames of a recorded video.
+
+    Every face of a sampled frame is classified, as on the live socket, and
+    faces are batched ``batch_size`` at a time. Frame timestamps are
+    video time, so the aggregate's trend buckets describe the recording.
+    Returns the session aggregate (as ``SessionStore.get`` would), a
+    timeline with one point per sampled frame, the number of frames analyzed
+    and the timestamp of the last one. Raises ValueError once a sample lies
+    past ``max_seconds``, which also bounds files whose header has no length.
+    """
+    interval = interval or VIDEO_SETTINGS["analysis_interval"]
+    batch_size = batch_size or VIDEO_SETTINGS.get("max_batch_size", 32)
+    aggregate = SessionAggregate(
+        0.0,
+        bucket_seconds or VIDEO_SETTINGS.get("trend_bucket_seconds", 60),
+        VIDEO_SETTINGS.get("trend_buckets", 30)
+    )
+    timeline = []
+    pending = []  # (timestamp, (N, 48, 48, 1) crops of every face), in frame order
+    faces = 0
+    last_timestamp = 0.0
+    max_faces = VIDEO_SETTINGS.get("max_faces", 8)
+
+    def flush():
+        crops = [frame_faces for _, frame_faces in pending if len(frame_faces)]
+        labels = iter(detector.predict_batch(np.concatenate(crops)) if crops else [])
+        for timestamp, frame_faces in pending:
+            # Every face counts towards the session, as on the live socket
+            emotions = [next(labels) for _ in range(len(frame_faces))] or ["neutral"]
+            scores = [score_map.get(emotion, 0.5) for emotion in emotions]
+            for emotion, score in zip(emotions, scores):
+                aggregate.add(emotion, score, timestamp)
+            timeline.append({
+                "offset_seconds": round(timestamp, 2),
+                "emotion": emotions[0],
+                "score": round(sum(scores) / len(scores), 3),
+                "faces": len(frame_faces),
+                "face_detected": len(frame_faces) > 0
+            })
+        pending.clear()
+
+    for timestamp, frame in sample_frames(path, interval):
+        if max_seconds is not None and timestamp > max_seconds:
+            raise ValueError(f"Video too long: more than {max_seconds:.0f}s")
+        last_timestamp = timestamp
+        _, frame_faces = detector.extract_faces(frame, max_faces=max_faces)
+        pending.append((timestamp, frame_faces))
+        faces += len(frame_faces)
+        if faces >= batch_size:
+            flush()
+            faces = 0
+    if pending:
+        flush()
+
+    return {
+        "session": aggregate.to_dict(),
+        "timeline": timeline,
+        "frames_analyzed": len(timeline),
+        "last_timestamp": last_timestamp
+    }
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+
+from config import CONVERSATION_SETTINGS
+
+DEFAULT_SESSION = "default"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting"""
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, budget: int, keep_end: bool = False) -> str:
+    """Cut ``text`` to roughly ``budget`` tokens on a word boundary"""
+    limit = budget * 4
+    if len(text) <= limit:
+        return text
+    if keep_end:
+        cut = text[-limit:]
+        return "..." + cut[cut.find(" ") + 1:] if " " in cut else "..." + cut
+    cut = text[:limit]
+    return cut[:cut.rfind(" ")] + "..." if " " in cut else cut + "..."
+
+
+class ConversationState:
+    """Bounded memory of one conversation.
+
+    The last ``max_turns`` exchanges are kept verbatim; older ones are folded
+    into a rolling summary capped at ``summary_token_budget``, so the prompt
+    stays the same size however long the conversation runs.
+    """
+
+    __slots__ = ("turns", "summary", "total_turns", "depressed_turns", "turns_since_llm", "last_active",
+                 "history_token_budget", "summary_token_budget")
+
+    def __init__(self, max_turns: int, history_token_budget: int, summary_token_budget: int):
+        self.turns = deque(maxlen=max_turns)
+        self.summary = ""
+        self.total_turns = 0
+        self.depressed_turns = 0
+        self.turns_since_llm = 0
+        self.last_active = time.time()
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+
+    def add_turn(self, user_text: str, ai_text: str, is_depressed: bool = False,
+                 from_llm: bool = True) -> None:
+        if len(self.turns) == self.turns.maxlen:
+            self._fold_into_summary(self.turns[0])
+        self.turns.append({"input": user_text, "output": ai_text})
+        self.total_turns += 1
+        if is_depressed:
+            self.depressed_turns += 1
+        self.turns_since_llm = 0 if from_llm else self.turns_since_llm + 1
+        self.last_active = time.time()
+
+    def _fold_into_summary(self, turn: Dict[str, str]) -> None:
+        # Only what the user said is worth keeping; the oldest text falls off the front
+        summary = f"{self.summary} {turn['input']}".strip()
+        self.summary = truncate_to_tokens(summary, self.summary_token_budget, keep_end=True)
+
+    def render_history(self) -> str:
+        """Summary plus the most recent exchanges that fit the history budget"""
+        lines = []
+        budget = self.history_token_budget
+        for turn in reversed(self.turns):
+            line = f"User: {turn['input']}\nAI: {turn['output']}"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                if not lines:
+                    lines.append(truncate_to_tokens(line, budget, keep_end=True))
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+
+        if self.summary:
+            earlier = self.total_turns - len(self.turns)
+            lines.insert(0, f"Earlier in the conversation ({earlier} exchanges, "
+                            f"{self.depressed_turns} flagged so far) the user said: {self.summary}")
+        return "\n".join(lines)
+
+
+class ConversationStore:
+    """Per-session conversation states with LRU and idle-TTL eviction.
+
+    Keyed by the WebSocket session id so sessions never see each other's
+    turns. At most ``max_sessions`` states are kept per worker.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings or CONVERSATION_SETTINGS
+        self.max_sessions = self.settings["max_sessions"]
+        self.ttl = self.settings["session_ttl"]
+        self._states: "OrderedDict[str, ConversationState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str]) -> ConversationState:
+        session_id = session_id or DEFAULT_SESSION
+        now = time.time()
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is not None and now - state.last_active > self.ttl:
+                state = None
+            if state is None:
+                state = ConversationState(
+                    self.settings["max_turns"],
+                    self.settings["history_token_budget"],
+                    self.settings["summary_token_budget"]
+                )
+                self._states[session_id] = state
+            self._states.move_to_end(session_id)
+            self._evict(now)
+            return state
+
+    def _evict(self, now: float) -> None:
+        # Oldest entries sit at the front, so stop at the first live one
+        while self._states:
+            session_id, state = next(iter(self._states.items()))
+            if len(self._states) > self.max_sessions or now - state.last_active > self.ttl:
+                del self._states[session_id]
+            else:
+                break
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._states)
@@ -1,6 +1,7 @@
 from .stt import STT
 from .tts import TTS
 from .llm import LLMProcessor
+from app.utils.metrics import ERRORS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,16 +14,61 @@ class VoiceBot:
         self.confidence = 0.5  # Initialize confidence to neutral by default
         logger.info("VoiceBot initialized successfully")
 
+    @staticmethod
+    def _transcript(transcription, error):
+        if error:
+            ERRORS.inc(component="voicebot", reason="transcription_failed")
+        return transcription
+
+    # Individual pipeline stages, so callers can schedule each one on its own pool
+    def transcribe(self, audio_path):
+        transcription, error = self.stt.transcribe(audio_path)
+        return self._transcript(transcription, error)
+
+    def transcribe_bytes(self, audio_bytes):
+        transcription, error = self.stt.transcribe_bytes(audio_bytes)
+        return self._transcript(transcription, error)
+
+    def transcribe_segment(self, audio, context=None):
+        transcription, error = self.stt.transcribe_array(audio, initial_prompt=context)
+        return self._transcript(transcription, error)
+
+    @property
+    def stt_batching(self):
+        return self.stt.batcher is not None
+
+    async def transcribe_bytes_async(self, audio_bytes):
+        transcription, error = await self.stt.transcribe_bytes_async(audio_bytes)
+        return self._transcript(transcription, error)
+
+    async def transcribe_segment_async(self, audio, context=None):
+        transcription, error = await self.stt.transcribe_array_async(audio, initial_prompt=context)
+        return self._transcript(transcription, error)
+
+    def analyze(self, transcription, session_id=None):
+        return self.llm.analyze_depression(transcription, session_id)
+
+    async def analyze_async(self, transcription, session_id=None):
+        return await self.llm.analyze_depression_async(transcription, session_id)
+
+    def stream_analysis(self, transcription, session_id=None):
+        """Async iterator of ("sentence", str) events followed by ("result", dict)"""
+        return self.llm.stream_depression_analysis(transcription, session_id)
+
+    def synthesize(self, text):
+        return self.tts.text_to_speech(text)
+
     def process_audio_for_depression(self, audio_path):
         try:
-            transcription, error = self.stt.transcribe(audio_path)
+            transcription = self.transcribe(audio_path)
             if not transcription:
                 return False, 0.5, "Audio could not be understood.", b""  # Default confidence=0.5 on error
-            
-            result = self.llm.analyze_depression(transcription)
-            audio_response = self.tts.text_to_speech(result["response"])
-            
+
+            result = self.analyze(transcription)
+            audio_response = self.synthesize(result["response"])
+
             # Return confidence from LLM analysis
             return result["is_depressed"], result["confidence"], result["response"], audio_response
         except Exception as e:
-            return False, 0.5, "Error analyzing depression status.", b""  # confidence=0.5 on exception
\ No newline at end of file
+            ERRORS.inc(component="voicebot", reason="exception")
+            return False, 0.5, "Error analyzing depression status.", b""  # confidence=0.5 on exception
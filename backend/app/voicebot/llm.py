@@ -1,16 +1,35 @@
 from groq import Groq
-from config import GROQ_API_KEY, GROQ_MODEL_NAME
+from config import GROQ_API_KEY, GROQ_MODEL_NAME, GROQ_BASE_URL, LLM_CACHE_SETTINGS, LLM_SETTINGS, DEPRESSION_ANALYSIS
+from .llm_client import async_llm_client
+from .conversation import ConversationStore
+from .streaming import JSONStringFieldStream, SentenceSplitter
+from .response_cache import ResponseCache
+from .prescreen import KeywordPrescreener
+from app.utils.metrics import STAGE_SECONDS, ERRORS
 import logging
 import ast
 import json
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
 class LLMProcessor:
+    REQUIRED_FIELDS = ["is_depressed", "confidence", "response", "reason"]
+
     def __init__(self):
-        self.client = Groq(api_key=GROQ_API_KEY)
-        self.conversation_history = []
+        self.client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
+        self.conversations = ConversationStore()  # per-session, bounded
+        self.response_cache = None
+        if LLM_CACHE_SETTINGS["enabled"]:
+            self.response_cache = ResponseCache(
+                LLM_CACHE_SETTINGS["ttl"],
+                LLM_CACHE_SETTINGS["max_entries"],
+                validate=self._is_valid_response
+            )
+        self.prescreener = KeywordPrescreener() if DEPRESSION_ANALYSIS["prescreen_enabled"] else None
+        self.prescreened = 0
+        self.escalated = 0
 
     def _extract_json(self, text):
         """Extract JSON from LLM response, handling various formats."""
@@ -30,74 +49,240 @@ class LLMProcessor:
                 logger.error("Could not extract JSON from response")
                 return None
 
-    def analyze_depression(self, text):
-        try:
-            history = "\n".join([f"User: {msg['input']}\nAI: {msg['output']}"
-                                 for msg in self.conversation_history[-3:]])  # Keep last 3 exchanges
+    def _build_prompt(self, text, conversation):
+        history = conversation.render_history()  # Summary + last few exchanges, token-budgeted
 
-            prompt = f"""
+        return f"""
 Analyze this conversation for depression symptoms. Consider the context:
 {history}
 Latest message: {text}
 
-Respond with ONLY the following JSON structure, without any additional text or formatting:
+Respond with ONLY the following JSON structure, without any additional text or formatting.
+Write "response" first; it is read out to the user while the rest is generated:
 {{
+    "response": str,
     "is_depressed": bool,
     "confidence": float,
-    "response": str,
     "reason": str
 }}
 """
 
-            logger.info(f"Sending prompt to LLM:\n{prompt}")
+    def _is_valid_response(self, raw_response):
+        """Only well-formed answers are worth caching"""
+        result = self._extract_json(raw_response)
+        return isinstance(result, dict) and all(field in result for field in self.REQUIRED_FIELDS)
 
-            response = self.client.chat.completions.create(
-                model=GROQ_MODEL_NAME,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                timeout=10,
-                response_format={"type": "json_object"}  # Request JSON response
-            )
+    def _cache_key(self, text, conversation):
+        history = conversation.render_history() if LLM_CACHE_SETTINGS["include_history"] else ""
+        return ResponseCache.key(text, history)
 
-            raw_response = response.choices[0].message.content.strip()
-            logger.info(f"Raw LLM output:\n{raw_response}")
+    def cache_stats(self):
+        return self.response_cache.stats() if self.response_cache else {"enabled": False}
 
-            # Parse the response
-            result = self._extract_json(raw_response)
-            
-            if not result or not isinstance(result, dict):
-                logger.error("Invalid response format from LLM")
-                result = {
-                    "is_depressed": False,
-                    "response": "I'm having trouble understanding right now.",
-                    "reason": "LLM returned invalid format",
-                    "confidence": 0.0
-                }
-
-            # Validate required fields
-            required_fields = ["is_depressed", "confidence", "response", "reason"]
-            if not all(field in result for field in required_fields):
-                logger.error("Missing required fields in LLM response")
-                result = {
-                    "is_depressed": False,
-                    "response": "Let's continue our conversation.",
-                    "reason": "Incomplete response from AI",
-                    "confidence": 0.0
-                }
-
-            # Add to conversation history
-            self.conversation_history.append({
-                "input": text,
-                "output": result["response"]
-            })
-
-            return result
+    def _prescreen(self, text, conversation):
+        """Answer locally when the pre-screen is confident; None means ask the LLM"""
+        if self.prescreener is None:
+            return None
+        assessment = self.prescreener.screen(text, conversation)
+        if assessment["escalate"]:
+            self.escalated += 1
+            return None
 
-        except Exception as e:
-            logger.exception("LLM analysis failed")
-            return {
+        self.prescreened += 1
+        result = {
+            "is_depressed": assessment["is_depressed"],
+            "confidence": assessment["confidence"],
+            "response": self.prescreener.canned_response(assessment["is_depressed"], conversation.total_turns),
+            "reason": assessment["reason"],
+            "source": "prescreen"
+        }
+        logger.info(f"Pre-screened without LLM: {result['reason']} ({result['confidence']})")
+        conversation.add_turn(text, result["response"], result["is_depressed"], from_llm=False)
+        return result
+
+    def prescreen_stats(self):
+        if self.prescreener is None:
+            return {"enabled": False}
+        total = self.prescreened + self.escalated
+        return {
+            "enabled": True,
+            "prescreened": self.prescreened,
+            "escalated": self.escalated,
+            "llm_calls_avoided": round(self.prescreened / total, 3) if total else None
+        }
+
+    def _request(self, prompt):
+        return {
+            "model": GROQ_MODEL_NAME,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}  # Request JSON response
+        }
+
+    def _handle_response(self, text, raw_response, conversation, record=True):
+        logger.debug("Raw LLM output:\n%s", raw_response)
+
+        # Parse the response
+        result = self._extract_json(raw_response)
+
+        if not result or not isinstance(result, dict):
+            logger.error("Invalid response format from LLM")
+            ERRORS.inc(component="llm", reason="invalid_format")
+            result = {
+                "is_depressed": False,
+                "response": "I'm having trouble understanding right now.",
+                "reason": "LLM returned invalid format",
+                "confidence": 0.0
+            }
+
+        # Validate required fields
+        if not all(field in result for field in self.REQUIRED_FIELDS):
+            logger.error("Missing required fields in LLM response")
+            ERRORS.inc(component="llm", reason="missing_fields")
+            result = {
                 "is_depressed": False,
                 "response": "Let's continue our conversation.",
-                "reason": "Error occurred",
+                "reason": "Incomplete response from AI",
                 "confidence": 0.0
-            }
\ No newline at end of file
+            }
+
+        # Add to this session's conversation history
+        if record:
+            conversation.add_turn(text, result["response"], bool(result["is_depressed"]))
+
+        return result
+
+    def _fallback(self):
+        ERRORS.inc(component="llm", reason="exception")
+        return {
+            "is_depressed": False,
+            "response": "Let's continue our conversation.",
+            "reason": "Error occurred",
+            "confidence": 0.0
+        }
+
+    def analyze_depression(self, text, session_id=None):
+        try:
+            conversation = self.conversations.get(session_id)
+            local = self._prescreen(text, conversation)
+            if local is not None:
+                return local
+
+            prompt = self._build_prompt(text, conversation)
+            logger.debug("Sending prompt to LLM:\n%s", prompt)
+
+            key = self._cache_key(text, conversation) if self.response_cache else None
+            raw_response = self.response_cache.get(key) if key else None
+            if raw_response is None:
+                start = time.perf_counter()
+                with STAGE_SECONDS.time(stage="llm_call"):
+                    response = self.client.chat.completions.create(
+                        timeout=LLM_SETTINGS["timeout"], **self._request(prompt)
+                    )
+                raw_response = response.choices[0].message.content.strip()
+                if key:
+                    self.response_cache.put(key, raw_response, time.perf_counter() - start)
+
+            return self._handle_response(text, raw_response, conversation)
+
+        except Exception as e:
+            logger.exception("LLM analysis failed")
+            return self._fallback()
+
+    async def analyze_depression_async(self, text, session_id=None):
+        """Same analysis over the shared pooled async client, with retries and hedging"""
+        try:
+            conversation = self.conversations.get(session_id)
+            local = self._prescreen(text, conversation)
+            if local is not None:
+                return local
+
+            prompt = self._build_prompt(text, conversation)
+            logger.debug("Sending prompt to LLM:\n%s", prompt)
+
+            async def complete():
+                with STAGE_SECONDS.time(stage="llm_call"):
+                    response = await async_llm_client.create(**self._request(prompt))
+                return response.choices[0].message.content.strip()
+
+            if self.response_cache:
+                # Identical concurrent requests share one upstream call
+                key = self._cache_key(text, conversation)
+                raw_response = await self.response_cache.get_or_compute(key, complete)
+            else:
+                raw_response = await complete()
+
+            return self._handle_response(text, raw_response, conversation)
+
+        except Exception as e:
+            logger.exception("Async LLM analysis failed")
+            return self._fallback()
+
+    async def stream_depression_analysis(self, text, session_id=None):
+        """Stream the analysis, yielding ("sentence", str) as the reply is generated.
+
+        The "response" field is cut into sentences while the JSON is still
+        arriving so TTS can start on the first one; the parsed result follows
+        as a final ("result", dict). JSON mode is not used here because the
+        API does not stream with it, so the prompt asks for "response" first.
+        Pre-screened and cached answers are replayed without calling the LLM.
+        """
+        conversation = self.conversations.get(session_id)
+        local = self._prescreen(text, conversation)
+        if local is not None:
+            yield "sentence", local["response"]
+            yield "result", local
+            return
+
+        prompt = self._build_prompt(text, conversation)
+        key = self._cache_key(text, conversation) if self.response_cache else None
+        cached = self.response_cache.get(key) if key else None
+
+        field = JSONStringFieldStream("response")
+        splitter = SentenceSplitter()
+        raw = []
+        parsed = False
+        try:
+            if cached is not None:
+                result = self._handle_response(text, cached, conversation, record=False)
+            else:
+                logger.debug("Streaming prompt to LLM:\n%s", prompt)
+                request = self._request(prompt)
+                request.pop("response_format")
+                # LLM time runs to the last delta and leaves out the time the
+                # consumer held the generator (speaking the yielded sentences)
+                start = time.perf_counter()
+                consumer_time = llm_time = 0.0
+                async for delta in async_llm_client.stream(**request):
+                    llm_time = time.perf_counter() - start - consumer_time
+                    raw.append(delta)
+                    for sentence in splitter.feed(field.feed(delta)):
+                        paused = time.perf_counter()
+                        yield "sentence", sentence
+                        consumer_time += time.perf_counter() - paused
+                STAGE_SECONDS.observe(llm_time, stage="llm_call")
+                raw_response = "".join(raw).strip()
+                if key:
+                    self.response_cache.put(key, raw_response, llm_time)
+                result = self._handle_response(text, raw_response, conversation, record=False)
+            parsed = True
+        except Exception:
+            logger.exception("Streaming LLM analysis failed")
+            result = self._fallback()
+
+        if field.started:
+            # The user already heard the streamed text; keep the final frame consistent with it
+            rest = splitter.flush()
+            if rest:
+                yield "sentence", rest
+            result["response"] = field.text.strip()
+        else:
+            for sentence in splitter.feed(result["response"] + " "):
+                yield "sentence", sentence
+            rest = splitter.flush()
+            if rest:
+                yield "sentence", rest
+        if parsed:
+            # Recorded only now, so the history holds exactly what was spoken
+            conversation.add_turn(text, result["response"], bool(result["is_depressed"]))
+        yield "result", result
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Optional
+
+import groq
+import httpx
+from groq import AsyncGroq
+
+from config import GROQ_API_KEY, GROQ_BASE_URL, LLM_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (
+    groq.APITimeoutError,
+    groq.APIConnectionError,
+    groq.RateLimitError,
+    groq.InternalServerError,
+)
+
+
+class LLMMetrics:
+    """Per-process latency, retry, hedge and token counters for Groq calls"""
+
+    def __init__(self, window: int = 500):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record_call(self, latency: float, usage: Any = None) -> None:
+        with self.lock:
+            self.calls += 1
+            self.latencies.append(latency)
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def count(self, name: str) -> None:
+        """Increment one of the failure/retry/hedge counters"""
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self.lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+            }
+
+
+class AsyncLLMClient:
+    """Shared async Groq client with pooling, a concurrency cap, retries and hedging.
+
+    One instance per process: its pooled HTTP connections and semaphore are
+    shared by every session. Transient failures (timeouts, connection errors,
+    429s, 5xx) are retried with exponential backoff and full jitter. With
+    hedging on, a request still running after the observed p95 latency gets
+    a second copy and whichever answers first wins.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None,
+                 base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.settings = settings or LLM_SETTINGS
+        self.base_url = base_url or GROQ_BASE_URL
+        self.api_key = api_key or GROQ_API_KEY
+        self.metrics = LLMMetrics()
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    async def _ensure_client(self) -> AsyncGroq:
+        # Connection pools belong to an event loop; rebuild if we moved loops
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                try:
+                    await self._client.close()
+                except Exception as e:  # its connections may belong to a loop that is already closed
+                    logger.debug("Could not close the previous LLM client: %s", e)
+            limits = httpx.Limits(
+                max_connections=self.settings["max_connections"],
+                max_keepalive_connections=self.settings["max_connections"]
+            )
+            self._client = AsyncGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,  # retries are handled here, with jitter
+                timeout=self.settings["timeout"],
+                http_client=httpx.AsyncClient(limits=limits, timeout=self.settings["timeout"])
+            )
+            self._semaphore = asyncio.Semaphore(self.settings["max_concurrency"])
+            self._loop = loop
+        return self._client
+
+    async def _attempt(self, **request):
+        client = await self._ensure_client()
+        async with self._semaphore:
+            start = time.perf_counter()
+            response = await client.chat.completions.create(**request)
+        self.metrics.record_call(time.perf_counter() - start, getattr(response, "usage", None))
+        return response
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.settings.get("hedge_enabled"):
+            return None
+        if len(self.metrics.latencies) < self.settings.get("hedge_min_samples", 20):
+            return None
+        return self.metrics.percentile(self.settings.get("hedge_percentile", 95))
+
+    async def _hedged(self, **request):
+        primary = asyncio.ensure_future(self._attempt(**request))
+        delay = self._hedge_delay()
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self.metrics.count("hedges")
+        hedge = asyncio.ensure_future(self._attempt(**request))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics.count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _retrying(self, call):
+        """Await ``call()``, retrying transient failures with backoff and full jitter"""
+        attempts = self.settings["max_retries"] + 1
+        for attempt in range(attempts):
+            try:
+                return await call()
+            except TRANSIENT_ERRORS as e:
+                if attempt == attempts - 1:
+                    self.metrics.count("failures")
+                    raise
+                self.metrics.count("retries")
+                backoff = min(self.settings["backoff_max"], self.settings["backoff_base"] * 2 ** attempt)
+                delay = random.uniform(0, backoff)
+                logger.warning(f"Transient LLM error ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                self.metrics.count("failures")
+                raise
+
+    async def create(self, **request):
+        """chat.completions.create with retries (and hedging when enabled)"""
+        return await self._retrying(lambda: self._hedged(**request))
+
+    async def stream(self, **request) -> AsyncIterator[str]:
+        """Yield content deltas of a streamed completion.
+
+        Only opening the stream is retried (nothing has reached the caller
+        yet at that point) and streams are never hedged. The concurrency slot
+        is held until the stream is fully consumed.
+        """
+        client = await self._ensure_client()
+        async with self._semaphore:
+            start = time.perf_counter()
+            stream = await self._retrying(
+                lambda: client.chat.completions.create(stream=True, **request)
+            )
+            usage = None
+            try:
+                async for chunk in stream:
+                    usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+        self.metrics.record_call(time.perf_counter() - start, usage)
+
+async_llm_client = AsyncLLMClient()
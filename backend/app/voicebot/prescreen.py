@@ -0,0 +1,99 @@
+import logging
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from config import DEPRESSION_ANALYSIS
+
+logger = logging.getLogger(__name__)
+
+NEGATIONS = ("not", "never", "no longer", "don't", "dont", "isn't", "wasn't", "am not", "hardly")
+
+
+def _alternation(terms: Iterable[str]) -> str:
+    # Longest first so "no motivation" wins over a shorter overlapping term
+    return "|".join(re.escape(t.lower()) for t in sorted(set(terms), key=len, reverse=True))
+
+
+class KeywordPrescreener:
+    """Millisecond-scale local depression screen run before the LLM.
+
+    All keyword lists are compiled into a single regex with one named group
+    per category, so an utterance is scanned once. A negation shortly before
+    a match ("not happy", "don't feel hopeless") flips its polarity. When a
+    joblib text classifier is configured, its probability is averaged with
+    the keyword estimate.
+
+    The screen may only skip the LLM for clearly fine utterances: any risk
+    phrase (regexes, so "killing myself" and "self-harm" match too), any
+    depressive term or negated positive, or fewer than ``min_evidence``
+    positive keywords always escalates. A missed risk costs far more than
+    an LLM call.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or DEPRESSION_ANALYSIS
+        self.threshold = settings["confidence_threshold"]
+        self.full_analysis_every = settings["full_analysis_every"]
+        self.min_evidence = settings.get("prescreen_min_evidence", 2)
+        self.responses = settings["prescreen_responses"]
+        depressive = list(settings["depression_keywords"]) + list(settings["depression_phrases"])
+        self.risk = re.compile(r"\b(?:%s)\b" % "|".join(settings["risk_phrases"]))
+        self.pattern = re.compile(
+            r"\b(?:(?P<depressive>%s)|(?P<positive>%s))\b" % (
+                _alternation(depressive),
+                _alternation(settings["positive_keywords"])
+            )
+        )
+        self.negation = re.compile(r"\b(?:%s)\s+(?:\w+\s+){0,2}$" % _alternation(NEGATIONS))
+        self.model = None
+        if settings.get("prescreen_model_path"):
+            import joblib
+            self.model = joblib.load(settings["prescreen_model_path"])
+            logger.info(f"Loaded pre-screen model from {settings['prescreen_model_path']}")
+
+    def assess(self, text: str) -> Dict[str, Any]:
+        """Preliminary is_depressed/confidence for ``text`` plus whether it needs the LLM"""
+        lowered = text.lower().replace("’", "'")
+        risk = self.risk.search(lowered)
+        if risk:
+            return {"is_depressed": True, "confidence": 0.0, "escalate": True,
+                    "reason": f"Risk phrase: '{risk.group(0)}'"}
+
+        depressive = positive = 0
+        depressive_terms = False  # negated or not, any depressive wording goes to the LLM
+        matched = []
+        for match in self.pattern.finditer(lowered):
+            negated = self.negation.search(lowered, max(0, match.start() - 30), match.start())
+            depressive_terms = depressive_terms or bool(match.group("depressive"))
+            is_depressive = bool(match.group("depressive")) != bool(negated)
+            depressive += is_depressive
+            positive += not is_depressive
+            matched.append(("not " if negated else "") + match.group(0))
+
+        # Keyword evidence as a probability of depression: 0.5 with no signal
+        evidence = depressive - positive
+        probability = min(0.95, max(0.05, 0.5 + 0.15 * evidence))
+        if self.model is not None:
+            probability = (probability + float(self.model.predict_proba([text])[0][1])) / 2
+
+        is_depressed = probability > 0.5
+        confidence = round(max(probability, 1 - probability), 3)
+        return {
+            "is_depressed": is_depressed,
+            "confidence": confidence,
+            # Only confidently positive utterances, with enough agreeing keywords, stay local
+            "escalate": depressive_terms or depressive > 0 or is_depressed or positive < self.min_evidence
+                        or confidence < self.threshold,
+            "reason": f"Pre-screen matched: {', '.join(matched)}" if matched else "Pre-screen found no signal"
+        }
+
+    def screen(self, text: str, conversation) -> Dict[str, Any]:
+        """``assess`` plus the periodic rule: every ``full_analysis_every``-th turn goes to the LLM"""
+        assessment = self.assess(text)
+        if conversation.turns_since_llm + 1 >= self.full_analysis_every:
+            assessment["escalate"] = True
+        return assessment
+
+    def canned_response(self, is_depressed: bool, turn: int) -> str:
+        options = self.responses["depressed" if is_depressed else "not_depressed"]
+        return options[turn % len(options)]
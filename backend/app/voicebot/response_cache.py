@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Case, punctuation and spacing insensitive form: "I'm  fine." -> "im fine" """
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub("", text.lower())).strip()
+
+
+class ResponseCache:
+    """TTL + LRU cache of raw LLM responses with in-flight request coalescing.
+
+    Keys combine the normalized transcript with a digest of the history
+    window that goes into the prompt, so a cached answer is only reused
+    when the model would have seen the same context. Concurrent misses for
+    the same key share one upstream call.
+    """
+
+    def __init__(self, ttl: float, max_entries: int,
+                 validate: Optional[Callable[[Any], bool]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.validate = validate
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, cost, expires)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def key(text: str, history: str = "") -> str:
+        digest = hashlib.sha256(history.encode("utf-8")).hexdigest()[:16]
+        return f"{digest}:{normalize_transcript(text)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.latency_saved += entry[1]
+            return entry[0]
+
+    def put(self, key: str, value: Any, cost: float = 0.0) -> None:
+        """Store ``value``; ``cost`` is the upstream latency a later hit will save"""
+        if self.validate is not None and not self.validate(value):
+            return
+        with self._lock:
+            self._entries[key] = (value, cost, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, join an identical in-flight call, or make the call"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            with self._lock:
+                self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The call we joined was cancelled with its caller; make our own
+                return await self.get_or_compute(key, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        start = time.perf_counter()
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            self.put(key, value, time.perf_counter() - start)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """hit_rate counts lookups answered without their own upstream call (hits + coalesced)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else None,
+                "latency_saved_s": round(self.latency_saved, 3)
+            }
@@ -0,0 +1,90 @@
+import json
+import re
+from typing import List, Optional
+
+# A sentence ends at . ! or ? (optionally followed by closing quotes/brackets) and whitespace
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JSONStringFieldStream:
+    """Pulls the value of one string field out of a JSON object as it streams in.
+
+    ``feed`` takes raw text deltas from the LLM and returns the newly decoded
+    characters of the field (escapes resolved), so the field can be spoken
+    before the rest of the object has arrived.
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = 0
+        self.started = False
+        self.finished = False
+        self.text = ""
+
+    def feed(self, delta: str) -> str:
+        if self.finished:
+            return ""
+        self._buffer += delta
+        if not self.started:
+            match = self._key.search(self._buffer)
+            if not match:
+                return ""
+            self.started = True
+            self._pos = match.end()
+
+        out = []
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            if char == '"':
+                self.finished = True
+                break
+            if char != "\\":
+                out.append(char)
+                self._pos += 1
+                continue
+            # Escape sequence: wait until it is complete
+            if self._pos + 1 >= len(buffer):
+                break
+            code = buffer[self._pos + 1]
+            if code == "u":
+                if self._pos + 6 > len(buffer):
+                    break
+                out.append(json.loads(f'"{buffer[self._pos:self._pos + 6]}"'))
+                self._pos += 6
+            else:
+                out.append(ESCAPES.get(code, code))
+                self._pos += 2
+
+        decoded = "".join(out)
+        self.text += decoded
+        return decoded
+
+
+class SentenceSplitter:
+    """Buffers streamed text and hands back whole sentences for TTS.
+
+    Sentences shorter than ``min_chars`` are held back and merged with the
+    next one so we don't pay a synthesis round-trip for "Hi."
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            if match.end() - start >= self.min_chars:
+                sentences.append(self._buffer[start:match.end()].strip())
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest or None
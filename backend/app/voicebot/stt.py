@@ -1,18 +1,57 @@
-import whisper
+import asyncio
 import logging
 import os
 import wave
 import numpy as np
-import librosa
 import base64
 from pathlib import Path
+from config import AUDIO_SETTINGS
+from app.utils.audio import validate_wav_bytes, wav_to_float32
+from app.utils.model_registry import registry
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.metrics import STAGE_SECONDS
+from .whisper_engines import create_whisper_engine
 
 logger = logging.getLogger(__name__)
 
+
+def load_whisper():
+    engine = create_whisper_engine()
+    logger.info(f"Whisper '{engine.model_size}' on backend '{engine.name}', "
+                f"language {engine.language or 'auto-detect'}")
+    return engine
+
+
+def warmup_whisper(engine):
+    engine.transcribe(np.zeros(AUDIO_SETTINGS["sample_rate"], dtype=np.float32))
+
+
+registry.register("whisper", load_whisper, warmup_whisper)
+
+
 class STT:
     def __init__(self):
-        self.model = whisper.load_model("base")
         logger.info("Initializing Speech-to-Text engine...")
+        self.batcher = None
+        if AUDIO_SETTINGS.get("stt_batching"):
+            self.batcher = MicroBatcher(
+                self._transcribe_batch,
+                window_ms=AUDIO_SETTINGS.get("stt_batch_window_ms", 50),
+                max_batch_size=AUDIO_SETTINGS.get("stt_max_batch_size", 8),
+                name="stt-batcher"
+            )
+        # Pool for the blocking parts of the async paths (WAV decoding, clips too
+        # long to batch); the voice routes point it at the scheduler's STT pool.
+        # None = the event loop's default executor.
+        self.executor = None
+
+    @property
+    def model(self):
+        return registry.get("whisper")
+
+    def _transcribe_batch(self, items):
+        with STAGE_SECONDS.time(stage="whisper_transcribe"):
+            return self.model.transcribe_batch(items)
 
     def validate_audio_file(self, audio_path):
         if not os.path.exists(audio_path):
@@ -40,14 +79,72 @@ class STT:
             logger.warning(f"Validation failed: {msg}")
             return "", msg
 
-        result = self.model.transcribe(
-            audio_path,
-            language="en",
-            task="transcribe",
-            fp16=False,
-            verbose=False
-        )
-        transcription = result["text"].strip()
+        return self._run_whisper(audio_path)
+
+    def _decode_bytes(self, audio_bytes):
+        """Validate and decode a WAV buffer; returns (16 kHz float32 audio or None, error)"""
+        with STAGE_SECONDS.time(stage="decode_audio"):
+            info, msg = validate_wav_bytes(
+                audio_bytes, AUDIO_SETTINGS["min_duration"], AUDIO_SETTINGS["max_duration"]
+            )
+            if info is None:
+                logger.warning(f"Validation failed: {msg}")
+                return None, msg
+
+            try:
+                return wav_to_float32(audio_bytes, info), None
+            except ValueError as e:
+                logger.warning(f"Could not decode audio buffer: {e}")
+                return None, f"Invalid WAV file: {e}"
+
+    def transcribe_bytes(self, audio_bytes):
+        """Transcribe an in-memory WAV buffer without temp files or an ffmpeg decode"""
+        audio, msg = self._decode_bytes(audio_bytes)
+        if audio is None:
+            return "", msg
+
+        return self._run_whisper(audio)
+
+    def transcribe_array(self, audio, initial_prompt=None):
+        """Transcribe a 16 kHz mono float32 segment, e.g. one cut by the streaming VAD.
+
+        ``initial_prompt`` carries the text of earlier segments so Whisper keeps context.
+        """
+        return self._run_whisper(audio, initial_prompt=initial_prompt or None)
+
+    async def transcribe_bytes_async(self, audio_bytes):
+        """``transcribe_bytes`` through the cross-session batcher"""
+        loop = asyncio.get_running_loop()
+        audio, msg = await loop.run_in_executor(self.executor, self._decode_bytes, audio_bytes)
+        if audio is None:
+            return "", msg
+
+        return await self._run_batched(audio)
+
+    async def transcribe_array_async(self, audio, initial_prompt=None):
+        """``transcribe_array`` through the cross-session batcher"""
+        return await self._run_batched(audio, initial_prompt or None)
+
+    async def _run_batched(self, audio, prompt=None):
+        # Before the model is loaded (on the batcher thread) every clip goes to the batch
+        limit = self.model.max_batch_samples if registry.is_loaded("whisper") else None
+        if limit is not None and len(audio) > limit:
+            # A long clip would hold the single batcher thread for seconds; give it a pool worker
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self._run_whisper, audio, prompt)
+
+        transcription = await self.batcher.submit((audio, prompt))
+        if not transcription:
+            logger.warning("Whisper returned empty transcription")
+            return "", "No speech detected"
+
+        logger.info(f"Transcription successful: '{transcription}'")
+        return transcription, None
+
+    def _run_whisper(self, audio, initial_prompt=None):
+        """Run Whisper on a file path or a 16 kHz mono float32 array"""
+        with STAGE_SECONDS.time(stage="whisper_transcribe"):
+            transcription = self.model.transcribe(audio, initial_prompt=initial_prompt)
 
         if not transcription:
             logger.warning("Whisper returned empty transcription")
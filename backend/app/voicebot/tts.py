@@ -1,28 +1,183 @@
-from gtts import gTTS
 import io
-from config import logger
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from config import logger, TTS_SETTINGS, DEPRESSION_ANALYSIS
+from app.utils.model_registry import registry
+from app.utils.metrics import STAGE_SECONDS, ERRORS
+from .tts_cache import AudioCache, cache_key
+
+
+class TTSBackend:
+    """A speech engine: turns one piece of text into encoded audio bytes"""
+
+    name = "base"
+    audio_format = "wav"
+
+    def synthesize(self, text, lang="en", voice=""):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS; needs network access for every uncached phrase"""
+
+    name = "gtts"
+    audio_format = "mp3"
+
+    def __init__(self):
+        from gtts import gTTS
+        self._gtts = gTTS
+
+    def synthesize(self, text, lang="en", voice=""):
+        audio_buffer = io.BytesIO()
+        self._gtts(text=text, lang=lang).write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+
+class Pyttsx3Backend(TTSBackend):
+    """Local engine (SAPI5 / NSSpeechSynthesizer / eSpeak) through pyttsx3"""
+
+    name = "pyttsx3"
+    audio_format = "wav"
+
+    def __init__(self):
+        import pyttsx3
+        self._engine = pyttsx3.init()
+        self._lock = threading.Lock()  # the engine is not thread-safe
+
+    def synthesize(self, text, lang="en", voice=""):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._lock:
+                if voice:
+                    self._engine.setProperty("voice", voice)
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+class EspeakBackend(TTSBackend):
+    """Local eSpeak NG binary; no Python dependency and safe to call from many threads"""
+
+    name = "espeak"
+    audio_format = "wav"
+
+    def __init__(self):
+        self._binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self._binary:
+            raise RuntimeError("espeak-ng is not installed")
+
+    def synthesize(self, text, lang="en", voice=""):
+        # Text goes in on stdin, so a reply starting with "-" is never read as an option
+        result = subprocess.run(
+            [self._binary, "-v", voice or lang, "--stdout", "--stdin"],
+            input=text.encode("utf-8"), capture_output=True, timeout=30, check=True
+        )
+        return result.stdout
+
+
+TTS_BACKENDS = {
+    "gtts": GTTSBackend,
+    "pyttsx3": Pyttsx3Backend,
+    "espeak": EspeakBackend
+}
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Process-wide synthesized-phrase cache, or None when caching is disabled"""
+    global _audio_cache
+    if not TTS_SETTINGS["cache_enabled"]:
+        return None
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache(
+                TTS_SETTINGS["memory_cache_bytes"],
+                TTS_SETTINGS["disk_cache_dir"] or None,
+                TTS_SETTINGS["disk_cache_bytes"],
+                extension="audio"
+            )
+    return _audio_cache
+
+
+def load_tts_backend():
+    backend = TTS_SETTINGS["backend"]
+    if backend not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {backend}")
+    return TTS_BACKENDS[backend]()
+
+
+def warmup_tts(backend):
+    # Fill the cache with the canned phrases; a no-op when they are already on disk
+    tts = TTS()
+    phrases = list(TTS_SETTINGS["prewarm_phrases"])
+    for responses in DEPRESSION_ANALYSIS["prescreen_responses"].values():
+        phrases.extend(responses)
+    for phrase in phrases:
+        tts.text_to_speech(phrase)
+
+
+registry.register("tts", load_tts_backend, warmup_tts)
+
 
 class TTS:
+    def __init__(self):
+        self.voice = TTS_SETTINGS["voice"]
+        self.max_cached_chars = TTS_SETTINGS["max_cached_chars"]
+
+    @property
+    def backend(self):
+        return registry.get("tts")
+
+    @property
+    def audio_format(self):
+        return TTS_BACKENDS.get(TTS_SETTINGS["backend"], TTSBackend).audio_format
+
+    def cache_stats(self):
+        cache = get_audio_cache()
+        return cache.stats() if cache is not None else {"enabled": False}
+
     def text_to_speech(self, text, lang='en'):
+        with STAGE_SECONDS.time(stage="tts"):
+            return self._text_to_speech(text, lang)
+
+    def _text_to_speech(self, text, lang):
         try:
             if not text.strip():
                 logger.warning(" Empty text provided to TTS")
                 return b""
 
+            cache = get_audio_cache() if len(text) <= self.max_cached_chars else None
+            key = None
+            if cache is not None:
+                key = cache_key(TTS_SETTINGS["backend"], lang, self.voice, text)
+                audio_data = cache.get(key)
+                if audio_data:
+                    return audio_data
+
             logger.info(f" Converting text to speech: '{text[:20]}...'")
-            tts = gTTS(text=text, lang=lang)
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            audio_data = audio_buffer.getvalue()
+            audio_data = self.backend.synthesize(text, lang=lang, voice=self.voice)
 
-            if len(audio_data) == 0:
+            if not audio_data:
                 logger.error(" Generated audio is empty")
+                ERRORS.inc(component="tts", reason="empty_audio")
                 return b""
 
+            if cache is not None:
+                cache.put(key, audio_data)
+
             logger.info("Audio generated successfully")
             return audio_data
 
         except Exception as e:
             logger.exception(f" TTS Error: {e}")
-            return b""
\ No newline at end of file
+            ERRORS.inc(component="tts", reason="exception")
+            return b""
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts: str) -> str:
+    """Content address for a synthesized phrase, e.g. cache_key(backend, lang, voice, text)"""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Two-tier cache of synthesized audio: an in-memory LRU in front of a directory.
+
+    Entries are content addressed, so the disk tier can be shared by every
+    worker on a host and survives restarts. Both tiers are bounded in bytes;
+    the disk tier drops its least recently written files when it fills up.
+    """
+
+    def __init__(self, max_memory_bytes: int, directory: Optional[str] = None,
+                 max_disk_bytes: int = 0, extension: str = "bin"):
+        self.max_memory_bytes = max_memory_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.extension = extension
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(directory) if entry.is_file()
+            )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.{self.extension}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        if self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            if data:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, data)
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._remember(key, data)
+        if self.directory:
+            self._write(key, data)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # atomic, so concurrent workers never read half a file
+        except OSError as e:
+            logger.warning(f"Could not write TTS cache entry: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += len(data)
+            over = self.max_disk_bytes and self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(self.extension)),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        target = self.max_disk_bytes * 0.9
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,98 @@
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import AUDIO_SETTINGS
+
+Segment = Tuple[Optional[np.ndarray], bool]
+
+
+class SpeechSegmenter:
+    """Energy-based voice activity detection over a streamed 16-bit PCM signal.
+
+    ``feed`` takes raw little-endian int16 mono chunks and returns a list of
+    ``(segment, end_of_speech)`` events. A segment (float32, ready for
+    Whisper) is cut after a short pause or once it reaches the maximum
+    segment length, so transcription can start while the user is still
+    talking. ``(None, True)`` marks the end of the utterance once the
+    speaker has been silent for ``end_of_speech_ms``.
+    """
+
+    def __init__(self, sample_rate=None, frame_ms=None, energy_threshold=None,
+                 segment_silence_ms=None, end_of_speech_ms=None, max_segment_duration=None,
+                 pre_roll_ms=150):
+        sample_rate = sample_rate or AUDIO_SETTINGS["sample_rate"]
+        frame_ms = frame_ms or AUDIO_SETTINGS.get("vad_frame_ms", 30)
+        segment_silence_ms = segment_silence_ms or AUDIO_SETTINGS.get("segment_silence_ms", 300)
+        end_of_speech_ms = end_of_speech_ms or AUDIO_SETTINGS.get("end_of_speech_ms", 900)
+        max_segment_duration = max_segment_duration or AUDIO_SETTINGS.get("max_segment_duration", 10)
+
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.energy_threshold = energy_threshold or AUDIO_SETTINGS.get("vad_energy_threshold", 0.01)
+        self.segment_silence_frames = max(1, segment_silence_ms // frame_ms)
+        self.end_of_speech_frames = max(1, end_of_speech_ms // frame_ms)
+        self.max_segment_frames = max(1, int(max_segment_duration * 1000) // frame_ms)
+
+        self._pending = np.empty(0, dtype=np.float32)
+        self._odd_byte = b""  # chunks need not be sample-aligned
+        self._preroll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._segment: List[np.ndarray] = []
+        self._silence_frames = 0
+        self._utterance_has_speech = False
+
+    def _cut(self) -> np.ndarray:
+        segment = np.concatenate(self._segment)
+        self._segment = []
+        return segment
+
+    def feed(self, pcm: bytes) -> List[Segment]:
+        if self._odd_byte:
+            pcm = self._odd_byte + pcm
+        self._odd_byte = pcm[len(pcm) - len(pcm) % 2:]
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2).astype(np.float32) / 32768.0
+        if self._pending.size:
+            samples = np.concatenate([self._pending, samples])
+
+        count = len(samples) // self.frame_len
+        frames = samples[:count * self.frame_len].reshape(count, self.frame_len)
+        self._pending = samples[count * self.frame_len:]
+        energies = np.sqrt(np.mean(frames * frames, axis=1)) if count else []
+
+        events: List[Segment] = []
+        for frame, energy in zip(frames, energies):
+            if energy >= self.energy_threshold:
+                if not self._segment:
+                    self._segment.extend(self._preroll)
+                    self._preroll.clear()
+                self._segment.append(frame)
+                self._silence_frames = 0
+                self._utterance_has_speech = True
+                if len(self._segment) >= self.max_segment_frames:
+                    events.append((self._cut(), False))
+                continue
+
+            self._silence_frames += 1
+            if self._segment:
+                self._segment.append(frame)
+                if self._silence_frames >= self.segment_silence_frames:
+                    events.append((self._cut(), False))
+            else:
+                self._preroll.append(frame)
+
+            if self._utterance_has_speech and self._silence_frames >= self.end_of_speech_frames:
+                events.append((None, True))
+                self._utterance_has_speech = False
+
+        return events
+
+    def flush(self) -> Segment:
+        """End of stream: return whatever speech is left and close the utterance"""
+        segment = self._cut() if self._segment else None
+        had_speech = self._utterance_has_speech or segment is not None
+        self._pending = np.empty(0, dtype=np.float32)
+        self._odd_byte = b""
+        self._preroll.clear()
+        self._silence_frames = 0
+        self._utterance_has_speech = False
+        return segment, had_speech
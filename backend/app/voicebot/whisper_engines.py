@@ -0,0 +1,183 @@
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import WHISPER_SETTINGS, SUPPORTED_LANGUAGES
+
+logger = logging.getLogger(__name__)
+
+
+class WhisperEngine:
+    """One Whisper inference backend.
+
+    ``transcribe`` takes a file path or a 16 kHz mono float32 array and
+    returns the text; ``transcribe_batch`` takes (audio, prompt) pairs and
+    returns one text per pair. ``language`` None means auto-detect.
+    """
+
+    name = "base"
+    # Longest clip (in samples) that ``transcribe_batch`` handles in one batched
+    # pass; longer clips should be transcribed on their own. None = no limit.
+    max_batch_samples: Optional[int] = None
+
+    def __init__(self, model_size: str, language: Optional[str]):
+        self.model_size = model_size
+        self.language = language
+
+    def transcribe(self, audio, initial_prompt: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    def transcribe_batch(self, items: Sequence[Tuple[np.ndarray, Optional[str]]]) -> List[str]:
+        return [self.transcribe(audio, prompt) for audio, prompt in items]
+
+
+def _plain_linears(model):
+    """Swap whisper's ``Linear`` subclass for ``torch.nn.Linear``, in place.
+
+    ``quantize_dynamic`` matches modules by exact type, so it skips whisper's
+    subclass (which only adds a dtype cast, a no-op in fp32 on CPU).
+    """
+    import torch
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(parent, name, plain)
+    return model
+
+
+class OpenAIWhisperEngine(WhisperEngine):
+    """The reference openai-whisper PyTorch model, optionally int8 dynamically quantized"""
+
+    name = "openai"
+    max_batch_samples = 30 * 16000  # whisper.audio.N_SAMPLES, one 30 s window
+
+    def __init__(self, model_size, language, quantize=False, cpu_threads=0):
+        super().__init__(model_size, language)
+        # Imported here so torch/whisper are only paid for by workers that transcribe
+        import torch
+        import whisper
+        if cpu_threads:
+            torch.set_num_threads(cpu_threads)
+        self.model = whisper.load_model(model_size, device="cpu")
+        if quantize:
+            # Linear layers dominate Whisper's CPU time; int8 weights, activations quantized on the fly
+            self.model = torch.quantization.quantize_dynamic(
+                _plain_linears(self.model), {torch.nn.Linear}, dtype=torch.qint8
+            )
+            if not any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in self.model.modules()):
+                raise RuntimeError("int8 quantization left no quantized Linear layers in the Whisper model")
+            self.name = "openai-int8"
+
+    def transcribe(self, audio, initial_prompt=None):
+        result = self.model.transcribe(
+            audio,
+            language=self.language,
+            task="transcribe",
+            fp16=False,
+            verbose=None,
+            initial_prompt=initial_prompt
+        )
+        return result["text"].strip()
+
+    def transcribe_batch(self, items):
+        """Transcribe several (audio, prompt) pairs with one batched encoder pass.
+
+        Each 16 kHz clip is padded/trimmed to Whisper's 30 s window and turned
+        into a log-mel spectrogram (one at a time, since normalization is per
+        clip); the spectrograms are stacked and encoded together. Decoding is
+        batched per distinct prompt because a decode call takes a single prompt.
+        Clips longer than 30 s (``max_batch_samples``) should be kept out of
+        the batch by the caller; any that arrive go through ``transcribe``.
+        """
+        import torch
+        import whisper
+
+        model = self.model
+        texts = [""] * len(items)
+        short = []
+        for i, (audio, prompt) in enumerate(items):
+            if len(audio) > whisper.audio.N_SAMPLES:
+                texts[i] = self.transcribe(audio, prompt)
+            else:
+                short.append(i)
+        if not short:
+            return texts
+
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(items[i][0])), model.dims.n_mels)
+            for i in short
+        ]).to(model.device)
+        with torch.no_grad():
+            features = model.embed_audio(mel)
+
+        groups = {}
+        for position, i in enumerate(short):
+            groups.setdefault(items[i][1] or None, []).append(position)
+        for prompt, positions in groups.items():
+            options = whisper.DecodingOptions(
+                language=self.language, task="transcribe", fp16=False,
+                without_timestamps=True, prompt=prompt
+            )
+            # Already-encoded features skip the encoder inside decode()
+            results = whisper.decode(model, features[positions], options)
+            for position, result in zip(positions, results):
+                # Same silence rule as transcribe(): likely no speech and a low-confidence decode
+                if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                    continue
+                texts[short[position]] = result.text.strip()
+        return texts
+
+
+class FasterWhisperEngine(WhisperEngine):
+    """CTranslate2 reimplementation (faster-whisper) with int8 CPU kernels"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size, language, compute_type="int8", cpu_threads=0):
+        super().__init__(model_size, language)
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(
+            model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+        )
+
+    def transcribe(self, audio, initial_prompt=None):
+        segments, _ = self.model.transcribe(
+            audio,
+            language=self.language,
+            task="transcribe",
+            beam_size=5,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+def resolve_language(language: Optional[str]) -> Optional[str]:
+    """"auto" (or empty) means detect; anything else must be in SUPPORTED_LANGUAGES"""
+    if not language or language == "auto":
+        return None
+    if language not in SUPPORTED_LANGUAGES:
+        raise ValueError(f"Unsupported Whisper language '{language}'; "
+                         f"use one of {sorted(SUPPORTED_LANGUAGES)} or 'auto'")
+    return language
+
+
+def create_whisper_engine(backend: Optional[str] = None, model_size: Optional[str] = None,
+                          language: Optional[str] = None) -> WhisperEngine:
+    """Build the engine selected by WHISPER_SETTINGS (each argument overrides its setting)"""
+    backend = backend or WHISPER_SETTINGS["backend"]
+    model_size = model_size or WHISPER_SETTINGS["model_size"]
+    language = resolve_language(language or WHISPER_SETTINGS["language"])
+    cpu_threads = WHISPER_SETTINGS["cpu_threads"]
+
+    if backend == "openai":
+        return OpenAIWhisperEngine(model_size, language, cpu_threads=cpu_threads)
+    if backend == "openai-int8":
+        return OpenAIWhisperEngine(model_size, language, quantize=True, cpu_threads=cpu_threads)
+    if backend == "faster-whisper":
+        return FasterWhisperEngine(model_size, language, WHISPER_SETTINGS["compute_type"], cpu_threads)
+    raise ValueError(f"Unknown Whisper backend: {backend}")
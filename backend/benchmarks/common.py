@@ -0,0 +1,44 @@
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+# Benchmarks import the app the same way main.py does: ``app.*`` from the
+# backend directory and ``config`` from inside the app directory.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+for path in (BACKEND_DIR, BACKEND_DIR / "app"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_s, wall_time_s=None):
+    """p50/p95/p99 in milliseconds plus throughput for a list of latencies"""
+    summary = {
+        "count": len(latencies_s),
+        "p50_ms": round(percentile(latencies_s, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies_s, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies_s, 99) * 1000, 3),
+    }
+    if wall_time_s:
+        summary["throughput_per_s"] = round(len(latencies_s) / wall_time_s, 3)
+    return summary
+
+
+def emit(name, results, output=None):
+    """Print a benchmark report as JSON and optionally write it to a file"""
+    report = {"benchmark": name, "timestamp": time.time(), "results": results}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        Path(output).write_text(text)
+    return report
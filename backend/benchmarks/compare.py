@@ -0,0 +1,74 @@
+"""Compare two benchmark JSON reports and flag regressions.
+
+Walks both reports, pairs up every latency summary (the dicts produced by
+``common.summarize``) at the same path, and prints the change in p50/p95/p99
+and throughput. Exits non-zero if any percentile got slower, or throughput
+lower, by more than ``--threshold`` percent.
+
+    python -m benchmarks.micro --output before.json   # on the base branch
+    python -m benchmarks.micro --output after.json    # with the change
+    python -m benchmarks.compare before.json after.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# metric -> True when a larger value is worse
+METRICS = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "throughput_per_s": False}
+
+
+def summaries(node, path=()):
+    """Yield (path, summary) for every latency summary nested in a report"""
+    if isinstance(node, dict):
+        if "p50_ms" in node:
+            yield "/".join(path), node
+            return
+        for key, value in node.items():
+            yield from summaries(value, path + (str(key),))
+
+
+def compare(before, after, threshold):
+    baseline = dict(summaries(before["results"]))
+    rows, regressions = [], []
+    for path, current in summaries(after["results"]):
+        previous = baseline.get(path)
+        if previous is None:
+            continue
+        for metric, larger_is_worse in METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = change > threshold if larger_is_worse else change < -threshold
+            rows.append({"path": path, "metric": metric, "before": old, "after": new,
+                         "change_pct": round(change, 1), "regression": worse})
+            if worse:
+                regressions.append(rows[-1])
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before.get("benchmark") != after.get("benchmark"):
+        sys.exit(f"Reports are from different benchmarks: {before.get('benchmark')} vs {after.get('benchmark')}")
+
+    rows, regressions = compare(before, after, args.threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['path']:<50} {row['metric']:<17} {row['before']:>12} -> {row['after']:<12} "
+              f"{row['change_pct']:+7.1f}%{flag}")
+    print(json.dumps({"compared": len(rows), "regressions": len(regressions)}))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
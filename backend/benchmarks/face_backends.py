@@ -0,0 +1,113 @@
+"""Face emotion engines compared: import time, load time, RSS and latency.
+
+Each backend runs in a fresh process, so import time and peak RSS are what
+a video worker using it would pay. Latency is measured per batch for batch
+size 1 (one live frame) and the micro-batcher's maximum, and each backend's
+output is checked against the Keras reference on the same inputs.
+
+Export the ONNX/TFLite files first:
+
+    python -m app.videobot.export_face_model --formats onnx tflite
+    python -m benchmarks.face_backends --threads 1 --output faces.json
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import emit, summarize
+
+
+def import_runtime(backend):
+    """Import only the runtime, so its cost is reported apart from loading the model"""
+    if backend == "keras":
+        import tensorflow  # noqa: F401
+    elif backend == "onnx":
+        import onnxruntime  # noqa: F401
+    elif backend == "tflite":
+        from app.videobot.face_engines import _tflite_interpreter_class
+        _tflite_interpreter_class()
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_backend(backend, threads, batch_sizes, repeats, faces, queue):
+    try:
+        os.environ["FACE_THREADS"] = str(threads)
+        from app.videobot.face_engines import create_face_engine
+        baseline_rss = peak_rss_mb()
+
+        start = time.perf_counter()
+        import_runtime(backend)
+        import_time = time.perf_counter() - start
+        start = time.perf_counter()
+        engine = create_face_engine(backend)
+        load_time = time.perf_counter() - start
+
+        latency = {}
+        for size in batch_sizes:
+            batch = faces[:size]
+            engine.predict(batch)  # warm-up, and tensor allocation for this batch size
+            latencies = []
+            wall_start = time.perf_counter()
+            for _ in range(repeats):
+                call_start = time.perf_counter()
+                engine.predict(batch)
+                latencies.append(time.perf_counter() - call_start)
+            summary = summarize(latencies, time.perf_counter() - wall_start)
+            summary["faces_per_s"] = round(summary.pop("throughput_per_s") * size, 1)
+            latency[f"batch_{size}"] = summary
+
+        queue.put({
+            "import_s": round(import_time, 3),
+            "load_s": round(load_time, 3),
+            "baseline_rss_mb": baseline_rss,
+            "peak_rss_mb": peak_rss_mb(),
+            "latency": latency,
+            "output": engine.predict(faces[:max(batch_sizes)])
+        })
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["keras", "onnx", "tflite"])
+    parser.add_argument("--threads", type=int, default=0, help="FACE_THREADS for every backend; 0 = default")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 32])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    faces = rng.uniform(0, 255, (max(args.batch_sizes), 48, 48, 1)).astype(np.float32)
+    context = multiprocessing.get_context("spawn")
+    results, outputs = {}, {}
+    for backend in args.backends:
+        queue = context.Queue()
+        process = context.Process(target=run_backend,
+                                  args=(backend, args.threads, args.batch_sizes, args.repeats, faces, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        if "output" in result:
+            outputs[backend] = result.pop("output")
+        results[backend] = result
+        print(f"{backend}: {result}", file=sys.stderr)
+
+    if "keras" in outputs:
+        reference = outputs["keras"]
+        for backend, output in outputs.items():
+            if backend != "keras":
+                results[backend]["max_abs_diff_vs_keras"] = float(np.max(np.abs(output - reference)))
+    emit("face_backends", {"threads": args.threads, "backends": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
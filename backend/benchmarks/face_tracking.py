@@ -0,0 +1,79 @@
+"""Face detection benchmark: full Haar detection on every frame vs. tracking mode.
+
+Reads frames from a recorded video (or a camera index), runs both modes
+single-threaded and reports frames/sec per core plus how often the tracking
+mode's face box agrees with full detection (both empty, or IoU >= 0.5).
+
+    python -m benchmarks.face_tracking --video session.mp4 --interval 5 --scale 0.5
+"""
+import argparse
+import time
+
+import cv2
+
+from benchmarks.common import emit
+from app.videobot.face_tracker import FaceLocator, FaceTrack, iou
+
+
+def load_frames(source, limit, width, height):
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frame = cv2.resize(frame, (width, height))
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    cap.release()
+    return frames
+
+
+def run(locator, frames, tracking):
+    track = FaceTrack() if tracking else None
+    boxes = []
+    start = time.perf_counter()
+    for gray in frames:
+        boxes.append(locator.locate(gray, track))
+    elapsed = time.perf_counter() - start
+    return boxes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", required=True, help="Video file path or camera index")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--interval", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=0.5)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)  # report per-core throughput
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    if not frames:
+        raise SystemExit(f"No frames could be read from {args.video}")
+
+    full_boxes, full_time = run(FaceLocator(mode="full", detection_scale=1.0), frames, False)
+    tracker = FaceLocator(mode="tracking", detection_interval=args.interval, detection_scale=args.scale)
+    tracked_boxes, tracked_time = run(tracker, frames, True)
+
+    agree = sum(
+        1 for a, b in zip(full_boxes, tracked_boxes)
+        if (a is None and b is None) or (a is not None and b is not None and iou(a, b) >= 0.5)
+    )
+    emit("face_tracking", {
+        "frames": len(frames),
+        "resolution": f"{args.width}x{args.height}",
+        "full_fps_per_core": round(len(frames) / full_time, 2),
+        "tracking_fps_per_core": round(len(frames) / tracked_time, 2),
+        "speedup": round(full_time / tracked_time, 2),
+        "agreement": round(agree / len(frames), 4),
+        "frames_with_face_full": sum(1 for b in full_boxes if b is not None),
+        "detection_interval": args.interval,
+        "detection_scale": args.scale,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
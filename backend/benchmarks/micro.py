@@ -0,0 +1,181 @@
+"""Micro-benchmarks of the per-request hot paths, for before/after comparisons.
+
+- frame_decode: JPEG decode of a WebSocket frame, then face detection and
+  ``EmotionDetector.detect_emotion`` (the latter needs the face model
+  and the runtime of the configured FACE_BACKEND)
+- stt: ``STT.transcribe`` on fixed WAV clips (needs Whisper weights)
+- generate_result: ``SessionStore`` aggregate -> ``VideoCapture._generate_result``
+  for sessions of increasing length
+- extract_json: ``LLMProcessor._extract_json`` on plain, fenced and non-strict answers
+
+Benchmarks whose models cannot be loaded are reported as skipped.
+
+    python -m benchmarks.micro --only generate_result extract_json --output micro.json
+    python -m benchmarks.micro --video session.mp4 --clips benchmarks/samples
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from benchmarks.common import emit, summarize
+from benchmarks.stt_decode import synth_wav
+
+BENCHMARKS = ("frame_decode", "stt", "generate_result", "extract_json")
+
+LLM_ANSWERS = {
+    "plain": '{"response": "How have you been sleeping?", "is_depressed": true, '
+             '"confidence": 0.8, "reason": "Reports hopelessness"}',
+    "fenced": '```json\n{"response": "Tell me more.", "is_depressed": false, '
+              '"confidence": 0.6, "reason": "Neutral tone"}\n```',
+    "literal": "{'response': 'Tell me more.', 'is_depressed': False, "
+               "'confidence': 0.6, 'reason': 'Single-quoted keys'}"
+}
+
+
+def measure(func, repeats):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        call_start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def synthetic_frames(count, width=640, height=480):
+    """Deterministic frames with gradients and noise, so JPEG sizes are realistic"""
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    frames = []
+    for i in range(count):
+        noise = rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+        frames.append(np.clip(ramp + noise + i % 50, 0, 255).astype(np.uint8))
+    return frames
+
+
+def video_frames(path, count):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def bench_frame_decode(args):
+    frames = video_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+    jpegs = [cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes() for frame in frames]
+    jpegs_cycle = _cycle(jpegs)
+
+    def decode():
+        # Same call as VideoCapture.process_frame
+        return cv2.imdecode(np.frombuffer(next(jpegs_cycle), np.uint8), cv2.IMREAD_COLOR)
+
+    results = {
+        "frames": len(jpegs),
+        "avg_jpeg_kb": round(sum(map(len, jpegs)) / len(jpegs) / 1024, 1),
+        "decode": measure(decode, args.repeats)
+    }
+
+    from app.videobot.emotion_detector import EmotionDetector
+    detector = EmotionDetector()
+    frames_cycle = _cycle(frames)
+    results["face_detect"] = measure(lambda: detector.extract_face(next(frames_cycle)), args.repeats)
+
+    try:
+        detector.model  # load (and time separately from the per-frame work)
+    except Exception as e:
+        results["detect_emotion"] = {"skipped": f"face model unavailable: {type(e).__name__}: {e}"}
+        return results
+    detector.detect_emotion(frames[0])  # warm-up
+    results["decode_and_detect_emotion"] = measure(lambda: detector.detect_emotion(decode()), args.repeats)
+    return results
+
+
+def bench_stt(args):
+    from app.voicebot.stt import STT
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.clips:
+            clips = sorted(Path(args.clips).glob("*.wav"))
+        else:
+            clips = [Path(workdir) / "tone_5s.wav"]
+            clips[0].write_bytes(synth_wav(5, 16000, 1))
+        if not clips:
+            return {"skipped": f"no .wav clips in {args.clips}"}
+
+        stt = STT()
+        try:
+            stt.model
+        except Exception as e:
+            return {"skipped": f"Whisper unavailable: {type(e).__name__}: {e}"}
+
+        results = {}
+        for clip in clips:
+            stt.transcribe(str(clip))  # warm-up
+            results[clip.name] = measure(lambda: stt.transcribe(str(clip)), max(1, args.repeats // 100))
+        return results
+
+
+def bench_generate_result(args):
+    from app.videobot.session_store import SessionAggregate
+    from app.videobot.video_capture import VideoCapture
+    from app.videobot.emotion_detector import EMOTION_LABELS
+    from config import VIDEO_SETTINGS
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for samples in args.session_samples:
+        aggregate = SessionAggregate(0.0, VIDEO_SETTINGS["trend_bucket_seconds"], VIDEO_SETTINGS["trend_buckets"])
+        emotions = rng.choice(EMOTION_LABELS, samples)
+        # One frame every 2 s of session time, like the default analysis interval
+        for i, emotion in enumerate(emotions):
+            aggregate.add(emotion, VideoCapture.EMOTION_TO_DEPRESSION_SCORE.get(emotion, 0.5), i * 2.0)
+        results[f"{samples}_samples"] = measure(
+            lambda: VideoCapture._generate_result("bench", aggregate.to_dict()), args.repeats
+        )
+    return results
+
+
+def bench_extract_json(args):
+    from app.voicebot.llm import LLMProcessor
+    processor = LLMProcessor.__new__(LLMProcessor)  # parsing only; no Groq client needed
+    return {
+        name: measure(lambda: processor._extract_json(answer), args.repeats)
+        for name, answer in LLM_ANSWERS.items()
+    }
+
+
+def _cycle(items):
+    while True:
+        yield from items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--repeats", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=50, help="distinct frames for frame_decode")
+    parser.add_argument("--video", help="take frame_decode frames from this video instead of synthetic ones")
+    parser.add_argument("--clips", help="directory of .wav clips for stt (default: a 5 s synthetic tone)")
+    parser.add_argument("--session-samples", nargs="+", type=int, default=[1000, 100000])
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    runners = {
+        "frame_decode": bench_frame_decode,
+        "stt": bench_stt,
+        "generate_result": bench_generate_result,
+        "extract_json": bench_extract_json
+    }
+    emit("micro", {name: runners[name](args) for name in args.only}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Replay a transcript corpus through the local pre-screen and report LLM calls avoided.
+
+The corpus is either a text file with one utterance per line (blank lines
+start a new session) or JSONL with "session_id" and "text" fields. Each
+utterance is screened exactly as ``LLMProcessor`` does; escalated turns are
+recorded as if the LLM had answered, without calling it. Without --corpus a
+small built-in sample is used.
+
+    python -m benchmarks.prescreen_replay --corpus transcripts.jsonl
+"""
+import argparse
+import json
+import time
+from collections import Counter
+
+from benchmarks.common import emit, summarize
+from app.voicebot.conversation import ConversationStore
+from app.voicebot.prescreen import KeywordPrescreener
+
+SAMPLE_CORPUS = [
+    ["I'm fine, thanks.", "Work has been okay.", "I'm tired all the time though.",
+     "I can't sleep and I feel empty.", "I don't know.", "Maybe it's just stress."],
+    ["I'm doing great!", "Excited about the weekend.", "Yeah, feeling good.", "Not much else."],
+    ["I feel hopeless and worthless.", "Nothing matters anymore.", "I'm so lonely.",
+     "Sometimes I want to die.", "I'm not happy at all."],
+    ["I don't know what to say.", "It's been a long week.", "I guess I'm okay.",
+     "I'm not sad, just busy.", "Things are better now."],
+]
+
+
+def load_corpus(path):
+    sessions = {}
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    sessions.setdefault(str(item.get("session_id", "default")), []).append(item["text"])
+            return list(sessions.values())
+        current = []
+        for line in f:
+            if line.strip():
+                current.append(line.strip())
+            elif current:
+                sessions[len(sessions)] = current
+                current = []
+        if current:
+            sessions[len(sessions)] = current
+    return list(sessions.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="utterances file (.txt or .jsonl)")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    sessions = load_corpus(args.corpus) if args.corpus else SAMPLE_CORPUS
+    prescreener = KeywordPrescreener()
+    conversations = ConversationStore(dict(
+        max_sessions=len(sessions) + 1, session_ttl=float("inf"),
+        max_turns=3, history_token_budget=400, summary_token_budget=150
+    ))
+
+    latencies = []
+    outcomes = Counter()
+    for index, utterances in enumerate(sessions):
+        conversation = conversations.get(str(index))
+        for text in utterances:
+            start = time.perf_counter()
+            assessment = prescreener.screen(text, conversation)
+            latencies.append(time.perf_counter() - start)
+
+            if assessment["escalate"]:
+                outcomes["llm"] += 1
+                conversation.add_turn(text, "", assessment["is_depressed"], from_llm=True)
+            else:
+                outcomes["prescreened_depressed" if assessment["is_depressed"] else "prescreened_not_depressed"] += 1
+                conversation.add_turn(text, "", assessment["is_depressed"], from_llm=False)
+
+    total = sum(outcomes.values())
+    avoided = total - outcomes["llm"]
+    emit("prescreen_replay", {
+        "sessions": len(sessions),
+        "utterances": total,
+        "llm_calls": outcomes["llm"],
+        "llm_calls_avoided": avoided,
+        "fraction_avoided": round(avoided / total, 3) if total else 0.0,
+        "outcomes": dict(outcomes),
+        "prescreen_latency": summarize(latencies)
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
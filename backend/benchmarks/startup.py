@@ -0,0 +1,63 @@
+"""Worker startup time and memory per modality.
+
+Starts a fresh interpreter for each configuration, imports ``app.main`` (which
+is what uvicorn does at worker start), optionally warms up the worker's
+models, and reports wall time and peak RSS. Compare "voice", "video" and
+"voice,video" to see what a single-modality worker saves.
+
+    python -m benchmarks.startup --warmup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, emit
+
+CHILD = """
+import json, resource, sys, time
+sys.path[:0] = [{backend!r}, {app!r}]
+start = time.perf_counter()
+import app.main
+from app.utils.model_registry import registry
+from config import ENABLED_MODALITIES, MODEL_SETTINGS
+imported = time.perf_counter()
+rss_after_import = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+warmup = 0.0
+if {warmup!r}:
+    names = [n for m in ENABLED_MODALITIES for n in MODEL_SETTINGS["modality_models"].get(m, [])]
+    registry.warmup(names)
+    warmup = time.perf_counter() - imported
+print(json.dumps({{
+    "import_seconds": round(imported - start, 3),
+    "warmup_seconds": round(warmup, 3),
+    "rss_after_import_mb": round(rss_after_import / 1024, 1),
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "models": registry.stats(),
+}}))
+"""
+
+
+def measure(modalities, warmup):
+    env = dict(os.environ, ENABLED_MODALITIES=modalities, WARMUP_MODELS="false")
+    code = CHILD.format(backend=str(BACKEND_DIR), app=str(BACKEND_DIR / "app"), warmup=warmup)
+    proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                          cwd=str(BACKEND_DIR / "app"))
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--warmup", action="store_true", help="Also load and warm up the models")
+    parser.add_argument("--modalities", nargs="+", default=["voice", "video", "voice,video"])
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    emit("startup", {m: measure(m, args.warmup) for m in args.modalities}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Whisper throughput vs. concurrency: one call per utterance vs. the cross-session batcher.
+
+Each of ``concurrency`` simulated sessions transcribes ``--utterances`` clips
+back to back. "unbatched" runs ``model.transcribe`` per clip on a thread pool
+of ``--workers`` threads (the old STT stage); "batched" submits every clip
+to the STT ``MicroBatcher`` so concurrent clips share one encoder pass.
+Reports audio-seconds transcribed per wall-clock second for each level.
+Use ``--wav`` with a real speech recording; the default synthetic tone makes
+Whisper's decoder output unrepresentative.
+
+    python -m benchmarks.stt_batching --concurrency 1 2 4 8 --wav sample.wav
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import emit, summarize
+from benchmarks.stt_decode import synth_wav
+from app.utils.audio import wav_to_float32
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.model_registry import registry
+import app.voicebot.stt  # registers "whisper" with the model registry
+
+
+async def run_unbatched(model, audio, concurrency, utterances, workers):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    latencies = []
+
+    async def session():
+        for _ in range(utterances):
+            start = time.perf_counter()
+            await loop.run_in_executor(
+                executor, lambda: model.transcribe(audio)
+            )
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    executor.shutdown()
+    return latencies, wall, None
+
+
+async def run_batched(model, audio, concurrency, utterances, window_ms, max_batch_size):
+    batcher = MicroBatcher(lambda items: model.transcribe_batch(items),
+                           window_ms=window_ms, max_batch_size=max_batch_size, name="stt-bench")
+    latencies = []
+
+    async def session():
+        for _ in range(utterances):
+            start = time.perf_counter()
+            await batcher.submit((audio, None))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    batcher.shutdown()
+    return latencies, wall, batcher.stats.snapshot()
+
+
+def report(latencies, wall, audio_seconds, batch_stats):
+    result = summarize(latencies, wall)
+    result["audio_seconds_per_wall_second"] = round(len(latencies) * audio_seconds / wall, 3)
+    if batch_stats:
+        result["avg_batch_size"] = batch_stats["avg_batch_size"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--utterances", type=int, default=4, help="clips per session")
+    parser.add_argument("--seconds", type=float, default=5, help="synthetic clip length")
+    parser.add_argument("--wav", help="use this WAV file as the utterance instead")
+    parser.add_argument("--workers", type=int, default=2, help="unbatched STT pool size")
+    parser.add_argument("--window-ms", type=float, default=50)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.wav:
+        with open(args.wav, "rb") as f:
+            audio = wav_to_float32(f.read())
+    else:
+        audio = wav_to_float32(synth_wav(args.seconds, 16000, 1))
+    audio_seconds = len(audio) / 16000
+    model = registry.get("whisper")
+    model.transcribe_batch([(audio, None)])  # warm up
+
+    levels = {}
+    for concurrency in args.concurrency:
+        unbatched = asyncio.run(run_unbatched(model, audio, concurrency, args.utterances, args.workers))
+        batched = asyncio.run(run_batched(model, audio, concurrency, args.utterances,
+                                          args.window_ms, args.max_batch_size))
+        levels[str(concurrency)] = {
+            "unbatched": report(*unbatched, audio_seconds),
+            "batched": report(*batched, audio_seconds),
+        }
+
+    emit("stt_batching", {
+        "clip_seconds": round(audio_seconds, 2),
+        "utterances_per_session": args.utterances,
+        "concurrency": levels
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
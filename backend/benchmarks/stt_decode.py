@@ -0,0 +1,98 @@
+"""Per-utterance audio decode cost: temp-file WAV round-trip vs. in-memory decoding.
+
+The "before" path mirrors the old voice route: write the decoded upload to a
+NamedTemporaryFile, validate it with ``wave`` and let Whisper's ffmpeg-based
+``load_audio`` read it back. The "after" path is ``validate_wav_bytes`` +
+``wav_to_float32``. Whisper inference itself is identical in both and is not
+included. Reports latency percentiles and peak Python allocations.
+
+    python -m benchmarks.stt_decode --seconds 10 --rate 44100 --channels 2
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+from benchmarks.common import emit, summarize
+from app.utils.audio import validate_wav_bytes, wav_to_float32
+
+
+def synth_wav(seconds, rate, channels):
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(np.repeat(tone, channels).tobytes())
+    return buf.getvalue()
+
+
+def decode_via_tempfile(audio_bytes):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmpfile:
+        wav_path = tmpfile.name
+    with open(wav_path, "wb") as f:
+        f.write(audio_bytes)
+    try:
+        with wave.open(wav_path, "rb") as wav_file:
+            wav_file.getnframes() / wav_file.getframerate()
+        try:
+            import whisper
+            return whisper.load_audio(wav_path)
+        except ImportError:
+            # No Whisper here: read the file back and decode it the same way,
+            # which understates the old cost by the ffmpeg subprocess
+            with open(wav_path, "rb") as f:
+                return wav_to_float32(f.read())
+    finally:
+        os.unlink(wav_path)
+
+
+def decode_in_memory(audio_bytes):
+    info, msg = validate_wav_bytes(audio_bytes, 0.5, 300)
+    return wav_to_float32(audio_bytes, info)
+
+
+def measure(func, audio_bytes, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(audio_bytes)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(audio_bytes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary = summarize(latencies)
+    summary["peak_alloc_kb"] = round(peak / 1024, 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    audio_bytes = synth_wav(args.seconds, args.rate, args.channels)
+    emit("stt_decode", {
+        "clip": {"seconds": args.seconds, "rate": args.rate, "channels": args.channels,
+                 "bytes": len(audio_bytes)},
+        "before_tempfile": measure(decode_via_tempfile, audio_bytes, args.repeats),
+        "after_in_memory": measure(decode_in_memory, audio_bytes, args.repeats),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Whisper backend x model size matrix: real-time factor, memory and word error rate.
+
+Every combination of ``--backends`` and ``--sizes`` runs in its own process
+so peak RSS reflects that engine alone. The sample set is a directory of
+16 kHz-compatible WAV files, each with a reference transcript in a ``.txt``
+file of the same name (``clip01.wav`` + ``clip01.txt``).
+
+    python -m benchmarks.stt_matrix --samples benchmarks/samples \\
+        --backends openai openai-int8 faster-whisper --sizes tiny base small
+
+RTF is processing time / audio duration (below 1 is faster than real time).
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import emit
+
+
+def load_samples(directory):
+    samples = []
+    for wav in sorted(Path(directory).glob("*.wav")):
+        reference = wav.with_suffix(".txt")
+        if reference.exists():
+            samples.append((wav, reference.read_text(encoding="utf-8").strip()))
+    if not samples:
+        sys.exit(f"No .wav/.txt pairs found in {directory}")
+    return samples
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance and reference length, after case/punctuation normalization"""
+    from app.voicebot.response_cache import normalize_transcript
+    ref = normalize_transcript(reference).split()
+    hyp = normalize_transcript(hypothesis).split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def run_config(backend, size, language, sample_dir, queue):
+    try:
+        from app.utils.audio import wav_to_float32
+        from app.voicebot.whisper_engines import create_whisper_engine
+
+        samples = load_samples(sample_dir)
+        start = time.perf_counter()
+        engine = create_whisper_engine(backend, size, language)
+        load_time = time.perf_counter() - start
+
+        audio_seconds = processing = 0.0
+        errors = words = 0
+        for wav, reference in samples:
+            audio = wav_to_float32(wav.read_bytes())
+            start = time.perf_counter()
+            hypothesis = engine.transcribe(audio)
+            processing += time.perf_counter() - start
+            audio_seconds += len(audio) / 16000
+            e, n = word_errors(reference, hypothesis)
+            errors, words = errors + e, words + n
+
+        queue.put({
+            "load_s": round(load_time, 2),
+            "rtf": round(processing / audio_seconds, 3),
+            "wer": round(errors / words, 3) if words else None,
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "audio_seconds": round(audio_seconds, 1)
+        })
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", required=True, help="directory of .wav + .txt pairs")
+    parser.add_argument("--backends", nargs="+", default=["openai", "openai-int8", "faster-whisper"])
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--language", default="en", help='language code or "auto"')
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    load_samples(args.samples)  # fail fast on an empty sample set
+    context = multiprocessing.get_context("spawn")
+    matrix = {}
+    for backend in args.backends:
+        for size in args.sizes:
+            queue = context.Queue()
+            process = context.Process(target=run_config,
+                                      args=(backend, size, args.language, args.samples, queue))
+            process.start()
+            result = queue.get()
+            process.join()
+            matrix[f"{backend}/{size}"] = result
+            print(f"{backend}/{size}: {result}", file=sys.stderr)
+
+    emit("stt_matrix", {"samples": args.samples, "language": args.language, "matrix": matrix}, args.output)
+
+
+if __name__ == "__main__":
+    main()
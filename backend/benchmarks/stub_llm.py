@@ -0,0 +1,155 @@
+"""Local stub of the Groq chat-completions API for benchmarks and load tests.
+
+Serves ``POST /openai/v1/chat/completions`` with a canned depression-analysis
+JSON answer after a configurable latency (streamed as SSE when requested), and can inject transient failures
+(HTTP 503) and slow outliers to exercise retries and hedging. Point the app at
+it with ``GROQ_BASE_URL=http://127.0.0.1:8901 GROQ_API_KEY=stub``.
+
+    python -m benchmarks.stub_llm --port 8901 --latency-ms 300 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_ANSWER = {
+    "response": "Thank you for sharing that. How have you been sleeping lately?",
+    "is_depressed": False,
+    "confidence": 0.4,
+    "reason": "Stub response"
+}
+
+
+class StubConfig:
+    def __init__(self, latency_ms=300.0, jitter_ms=50.0, error_rate=0.0,
+                 slow_rate=0.0, slow_ms=3000.0, answer=None, token_ms=20.0,
+                 fail_first=0, slow_first=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.answer = answer or CANNED_ANSWER
+        self.token_ms = token_ms
+        # Deterministic faults for tests: the first N requests fail (503) / are slow
+        self.fail_first = fail_first
+        self.slow_first = slow_first
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client cancelled (e.g. a hedged request lost the race)
+
+        def _stream(self, request, content):
+            # Server-sent events, a few characters per chunk like a token stream
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            base = {"id": f"chatcmpl-stub-{config.requests}", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": request.get("model", "stub")}
+            try:
+                for i in range(0, len(content), 4):
+                    chunk = dict(base, choices=[{"index": 0, "delta": {"content": content[i:i + 4]},
+                                                 "finish_reason": None}])
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(config.token_ms / 1000)
+                final = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            self.close_connection = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            with config.lock:
+                config.requests += 1
+                number = config.requests
+
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            if number <= config.slow_first or random.random() < config.slow_rate:
+                delay = config.slow_ms
+            time.sleep(max(0.0, delay) / 1000)
+
+            if number <= config.fail_first or random.random() < config.error_rate:
+                self._send_json(503, {"error": {"message": "stub overloaded", "type": "server_error"}})
+                return
+
+            content = json.dumps(config.answer)
+            if request.get("stream"):
+                self._stream(request, content)
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-stub-{config.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": sum(len(m.get("content", "")) // 4 for m in request.get("messages", [])),
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": 0
+                }
+            })
+
+    return Handler
+
+
+def start_stub_server(port=0, config=None):
+    """Start the stub in a background thread; returns (server, base_url)"""
+    config = config or StubConfig()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--token-ms", type=float, default=20, help="delay between streamed chunks")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.slow_rate,
+                        args.slow_ms, token_ms=args.token_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(config))
+    print(f"Stub Groq API listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
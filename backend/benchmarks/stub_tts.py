@@ -0,0 +1,37 @@
+"""Silent stand-in TTS engine for load tests.
+
+Returns a silent WAV about as long as the text takes to say, after a fixed
+delay, so a load test measures the server and not a speech engine. It is
+not part of the app: ``install`` adds it to ``TTS_BACKENDS`` in the process
+that serves the load test, which then selects it with ``TTS_BACKEND=silence``.
+"""
+import io
+import time
+import wave
+
+from benchmarks.common import BACKEND_DIR  # noqa: F401  (puts the app on sys.path)
+from app.voicebot.tts import TTS_BACKENDS, TTSBackend
+
+
+class SilenceBackend(TTSBackend):
+    name = "silence"
+    audio_format = "wav"
+    sample_rate = 16000
+    seconds_per_char = 0.06
+    latency_ms = 0.0
+
+    def synthesize(self, text, lang="en", voice=""):
+        time.sleep(self.latency_ms / 1000)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(b"\x00\x00" * int(len(text) * self.seconds_per_char * self.sample_rate))
+        return buffer.getvalue()
+
+
+def install(latency_ms: float = 0.0) -> None:
+    """Register the "silence" backend, simulating ``latency_ms`` of synthesis per phrase"""
+    SilenceBackend.latency_ms = latency_ms
+    TTS_BACKENDS[SilenceBackend.name] = SilenceBackend
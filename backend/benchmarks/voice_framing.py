@@ -0,0 +1,71 @@
+"""Voice WebSocket payload cost: base64-in-JSON vs. binary framing.
+
+Builds a clip of AUDIO_SETTINGS["max_duration"] seconds (5 minutes of 16 kHz
+mono PCM by default) and measures, for a full upload + download round-trip,
+the bytes on the wire and the CPU time spent encoding and decoding messages
+in each mode. Socket transfer time is not included.
+
+    python -m benchmarks.voice_framing --repeats 5
+"""
+import argparse
+import base64
+import json
+import time
+
+from benchmarks.common import emit, summarize
+from benchmarks.stt_decode import synth_wav
+from config import AUDIO_SETTINGS
+
+
+def json_round_trip(audio):
+    # client upload
+    message = json.dumps({"type": "audio", "audio": base64.b64encode(audio).decode()})
+    received = base64.b64decode(json.loads(message)["audio"])
+    # server reply carrying the same amount of audio back
+    reply = json.dumps({"type": "ai_response", "audio_response": base64.b64encode(received).decode()})
+    base64.b64decode(json.loads(reply)["audio_response"])
+    return len(message) + len(reply)
+
+
+def binary_round_trip(audio):
+    header = json.dumps({"type": "audio", "size": len(audio)})
+    json.loads(header)
+    received = bytes(memoryview(audio))  # the single copy a socket read makes
+    reply = json.dumps({"type": "ai_response", "audio_size": len(received), "audio_format": "mp3"})
+    json.loads(reply)
+    return len(header) + len(received) + len(reply) + len(received)
+
+
+def measure(func, audio, repeats):
+    latencies, wire_bytes = [], 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        wire_bytes = func(audio)
+        latencies.append(time.perf_counter() - start)
+    summary = summarize(latencies)
+    summary["wire_bytes"] = wire_bytes
+    summary["throughput_mb_per_s"] = round(2 * len(audio) / 1e6 / (sum(latencies) / repeats), 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=AUDIO_SETTINGS["max_duration"])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    audio = synth_wav(args.seconds, AUDIO_SETTINGS["sample_rate"], AUDIO_SETTINGS["channels"])
+    json_mode = measure(json_round_trip, audio, args.repeats)
+    binary_mode = measure(binary_round_trip, audio, args.repeats)
+    emit("voice_framing", {
+        "clip_seconds": args.seconds,
+        "clip_bytes": len(audio),
+        "json_base64": json_mode,
+        "binary_v1": binary_mode,
+        "wire_overhead_saved": round(1 - binary_mode["wire_bytes"] / json_mode["wire_bytes"], 3),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
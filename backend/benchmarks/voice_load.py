@@ -0,0 +1,112 @@
+"""Load benchmark for the voice pipeline: inline (blocking) vs. InferenceScheduler.
+
+Simulates N concurrent voice sessions, each sending several utterances.
+Stage costs are simulated with ``time.sleep`` (which, like Whisper, gTTS and
+the Groq client, releases the GIL) so the benchmark runs without models or
+network access. Reports per-utterance latency percentiles and the worst
+event-loop stall observed in each mode.
+
+    python -m benchmarks.voice_load --sessions 20 --utterances 5
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import emit, summarize
+from app.utils.inference_scheduler import InferenceScheduler, SchedulerBusy
+
+
+def make_pipeline(stt_ms, llm_ms, tts_ms):
+    def stt(_):
+        time.sleep(stt_ms / 1000)
+        return "I have been feeling tired"
+
+    def llm(_):
+        time.sleep(llm_ms / 1000)
+        return {"response": "Tell me more."}
+
+    def tts(_):
+        time.sleep(tts_ms / 1000)
+        return b"audio"
+
+    return stt, llm, tts
+
+
+async def _loop_lag_probe(stop, lags, interval=0.01):
+    """Measure how late the event loop wakes up a periodic task"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode, sessions, utterances, stages, think_s):
+    stt, llm, tts = stages
+    scheduler = InferenceScheduler() if mode == "scheduler" else None
+    latencies, busy = [], 0
+
+    async def session():
+        nonlocal busy
+        sent_at = time.perf_counter()
+        for _ in range(utterances):
+            # Latency is measured from when the client sent the utterance, so
+            # time spent waiting for a blocked event loop is included.
+            await asyncio.sleep(max(0.0, sent_at - time.perf_counter()))
+            start = sent_at
+            if scheduler is None:
+                tts(llm(stt(b"")))
+            else:
+                try:
+                    text = await scheduler.run("stt", stt, b"")
+                    result = await scheduler.run("llm", llm, text)
+                    await scheduler.run("tts", tts, result["response"])
+                except SchedulerBusy:
+                    busy += 1
+                    sent_at = time.perf_counter() + think_s
+                    continue
+            done = time.perf_counter()
+            latencies.append(done - start)
+            sent_at = max(done, sent_at) + think_s
+
+    stop, lags = asyncio.Event(), []
+    probe = asyncio.create_task(_loop_lag_probe(stop, lags))
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    wall = time.perf_counter() - wall_start
+    stop.set()
+    await probe
+    if scheduler:
+        scheduler.shutdown()
+
+    summary = summarize(latencies, wall)
+    summary["busy_rejections"] = busy
+    summary["max_loop_stall_ms"] = round(max(lags, default=0.0) * 1000, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--utterances", type=int, default=5)
+    parser.add_argument("--stt-ms", type=float, default=300)
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--think-ms", type=float, default=500,
+                        help="Pause between a reply and the next utterance")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    stages = make_pipeline(args.stt_ms, args.llm_ms, args.tts_ms)
+    think_s = args.think_ms / 1000
+    results = {
+        "sessions": args.sessions,
+        "before_inline": asyncio.run(
+            run_mode("inline", args.sessions, args.utterances, stages, think_s)),
+        "after_scheduler": asyncio.run(
+            run_mode("scheduler", args.sessions, args.utterances, stages, think_s)),
+    }
+    emit("voice_load", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
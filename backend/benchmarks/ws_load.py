@@ -0,0 +1,208 @@
+"""WebSocket load generator: N concurrent synthetic voice and video clients.
+
+Voice clients speak the binary protocol: each sends a WAV clip as one
+utterance, waits for the full reply (JSON + audio frame), thinks, and
+repeats. Video clients send JPEG frames at ``--fps`` and record the
+server-side latency and rate of the "analysis" messages that come back
+(the server drops frames it has no time for, so sends and replies are not
+one-to-one).
+
+With ``--serve`` a local server is started for the run, with the LLM
+pointed at the stub Groq API (benchmarks/stub_llm.py) and the silent TTS
+stub (benchmarks/stub_tts.py), so only STT and the face model do real work. Without it, ``--url``
+names an already running server.
+
+    python -m benchmarks.ws_load --serve --voice 8 --video 8 --duration 30 --audio hello.wav
+    python -m benchmarks.ws_load --url ws://127.0.0.1:8000 --video 20 --output load.json
+
+The synthetic default clip is a tone, which Whisper usually rejects as "no
+speech"; pass ``--audio`` with a spoken clip to drive the LLM and TTS stages.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+import cv2
+import websockets
+
+from benchmarks.common import BACKEND_DIR, emit, summarize
+from benchmarks.micro import synthetic_frames, video_frames
+from benchmarks.stt_decode import synth_wav
+from benchmarks.stub_llm import StubConfig, start_stub_server
+
+SERVER = """
+import sys
+sys.path[:0] = [{backend!r}, {app!r}]
+import uvicorn
+from benchmarks.stub_tts import install
+install({tts_latency_ms!r})
+uvicorn.run("app.main:app", host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, workdir):
+    """Stub LLM in this process, the app in a child process; returns (process, ws base url)"""
+    stub, stub_url = start_stub_server(config=StubConfig(args.llm_latency_ms, token_ms=args.llm_token_ms))
+    port = free_port()
+    env = dict(
+        os.environ,
+        GROQ_API_KEY="stub",
+        GROQ_BASE_URL=stub_url,
+        TTS_BACKEND="silence",
+        TTS_CACHE_DIR=os.path.join(workdir, "tts_cache"),
+        VIDEO_SESSION_STORE="memory"
+    )
+    code = SERVER.format(backend=str(BACKEND_DIR), app=str(BACKEND_DIR / "app"), port=port,
+                         tts_latency_ms=args.tts_latency_ms)
+    # Run from a scratch directory so the server's log file lands there
+    process = subprocess.Popen([sys.executable, "-c", code], env=env, cwd=workdir)
+
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited during startup with code {process.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/models", timeout=1)
+            return process, f"ws://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    sys.exit("Server did not start in time")
+
+
+async def voice_client(base_url, index, audio, args, stop_at, latencies, outcomes):
+    async with websockets.connect(f"{base_url}/api/voice/ws/conversation/load-voice-{index}",
+                                  max_size=None) as ws:
+        await ws.send(json.dumps({"type": "hello", "protocol": "binary", "version": 1}))
+        json.loads(await ws.recv())
+        # Stagger the first utterances so clients do not move in lockstep
+        await asyncio.sleep(index * args.think_ms / 1000 / max(1, args.voice))
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "audio", "size": len(audio)}))
+            await ws.send(audio)
+            while True:
+                message = json.loads(await ws.recv())
+                if message["type"] in ("partial_transcript", "response_audio"):
+                    if message.get("audio_size"):
+                        await ws.recv()
+                    continue
+                break
+            if message.get("audio_size"):
+                await ws.recv()
+            outcomes[message["type"]] += 1
+            if message["type"] == "ai_response":
+                latencies.append(time.perf_counter() - start)
+            elif message["type"] == "busy":
+                await asyncio.sleep(message.get("retry_after", 1.0))
+            await asyncio.sleep(args.think_ms / 1000)
+
+
+async def video_client(base_url, index, jpegs, args, stop_at, latencies, outcomes):
+    async with websockets.connect(f"{base_url}/api/video/ws/video/load-video-{index}") as ws:
+        async def send_frames():
+            frame = 0
+            while time.perf_counter() < stop_at:
+                await ws.send(jpegs[frame % len(jpegs)])
+                outcomes["frames_sent"] += 1
+                frame += 1
+                await asyncio.sleep(1 / args.fps)
+
+        sender = asyncio.create_task(send_frames())
+        try:
+            while time.perf_counter() < stop_at:
+                try:
+                    message = json.loads(await asyncio.wait_for(ws.recv(), stop_at - time.perf_counter()))
+                except asyncio.TimeoutError:
+                    break
+                outcomes[message["type"]] += 1
+                if message["type"] == "analysis":
+                    latencies.append(message["latency_ms"] / 1000)
+        finally:
+            sender.cancel()
+
+
+async def run(base_url, args):
+    audio = Path(args.audio).read_bytes() if args.audio else synth_wav(args.clip_seconds, 16000, 1)
+    frames = video_frames(args.video_file, 50) if args.video_file else synthetic_frames(50)
+    jpegs = [cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes() for frame in frames]
+
+    voice_latencies, video_latencies = [], []
+    voice_outcomes, video_outcomes = Counter(), Counter()
+    start = time.perf_counter()
+    stop_at = start + args.duration
+    clients = [voice_client(base_url, i, audio, args, stop_at, voice_latencies, voice_outcomes)
+               for i in range(args.voice)]
+    clients += [video_client(base_url, i, jpegs, args, stop_at, video_latencies, video_outcomes)
+                for i in range(args.video)]
+    errors = [repr(e) for e in await asyncio.gather(*clients, return_exceptions=True) if e is not None]
+    wall = time.perf_counter() - start
+
+    results = {
+        "config": {
+            "voice_clients": args.voice, "video_clients": args.video, "duration_s": args.duration,
+            "fps": args.fps, "think_ms": args.think_ms, "served_stub": args.serve
+        },
+        "voice": dict(summarize(voice_latencies, wall), outcomes=dict(voice_outcomes)),
+        "video": dict(summarize(video_latencies, wall), outcomes=dict(video_outcomes)),
+        "client_errors": errors[:10]
+    }
+    http_base = base_url.replace("ws://", "http://").replace("wss://", "https://")
+    for name, path in (("voice_stats", "/api/voice/stats"), ("video_stats", "/api/video/stats")):
+        try:
+            with urllib.request.urlopen(http_base + path, timeout=5) as response:
+                results[name] = json.loads(response.read())
+        except OSError:
+            pass
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="server base URL (ignored with --serve)")
+    parser.add_argument("--serve", action="store_true", help="start a local server with stub LLM and TTS")
+    parser.add_argument("--voice", type=int, default=4, help="concurrent voice clients")
+    parser.add_argument("--video", type=int, default=4, help="concurrent video clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--audio", help="WAV clip each voice client sends (default: synthetic tone)")
+    parser.add_argument("--clip-seconds", type=float, default=3)
+    parser.add_argument("--think-ms", type=float, default=1000, help="pause between a reply and the next utterance")
+    parser.add_argument("--video-file", help="take frames from this video instead of synthetic ones")
+    parser.add_argument("--fps", type=float, default=5, help="frames sent per video client per second")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="stub LLM latency (--serve)")
+    parser.add_argument("--llm-token-ms", type=float, default=20, help="stub LLM streaming delay (--serve)")
+    parser.add_argument("--tts-latency-ms", type=float, default=100, help="stub TTS latency (--serve)")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    if not args.serve:
+        emit("ws_load", asyncio.run(run(args.url, args)), args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process, base_url = start_server(args, workdir)
+        try:
+            emit("ws_load", asyncio.run(run(base_url, args)), args.output)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import os
+import sys
+from pathlib import Path
+
+# Tests import the app the same way main.py does: ``app.*`` from the
+# backend directory and ``config`` from inside the app directory.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+for path in (BACKEND_DIR, BACKEND_DIR / "app"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+# The Groq clients refuse to start without an API key; tests only talk to local stubs
+os.environ.setdefault("GROQ_API_KEY", "test")
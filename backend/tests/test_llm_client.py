@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import groq
+import pytest
+
+from benchmarks.stub_llm import StubConfig, start_stub_server
+from app.voicebot.llm_client import AsyncLLMClient
+from config import LLM_SETTINGS
+
+REQUEST = {"model": "stub", "messages": [{"role": "user", "content": "How are you?"}]}
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**config):
+        server, url = start_stub_server(config=StubConfig(jitter_ms=0, **config))
+        servers.append(server)
+        return server.config, url + "/openai/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_client(url, **settings):
+    return AsyncLLMClient(dict(LLM_SETTINGS, backoff_base=0.01, backoff_max=0.05, **settings),
+                          base_url=url, api_key="stub")
+
+
+def test_transient_503_is_retried_until_success(stub):
+    config, url = stub(latency_ms=5, fail_first=2)
+    client = make_client(url, max_retries=3)
+
+    response = asyncio.run(client.create(**REQUEST))
+
+    assert response.choices[0].message.content
+    assert config.requests == 3
+    assert client.metrics.retries == 2
+    assert client.metrics.failures == 0
+
+
+def test_slow_request_is_hedged_after_p95(stub):
+    config, url = stub(latency_ms=5, slow_first=1, slow_ms=2000)
+    client = make_client(url, hedge_enabled=True, hedge_min_samples=20)
+    for _ in range(20):
+        client.metrics.record_call(0.05)  # observed p95 of 50 ms
+
+    start = time.perf_counter()
+    response = asyncio.run(client.create(**REQUEST))
+
+    assert response.choices[0].message.content
+    assert time.perf_counter() - start < 1.5  # did not wait for the 2 s primary
+    assert client.metrics.hedges == 1
+    assert client.metrics.hedge_wins == 1
+
+
+def test_exhausted_retries_raise_and_count_a_failure(stub):
+    config, url = stub(latency_ms=5, error_rate=1.0)
+    client = make_client(url, max_retries=2)
+
+    with pytest.raises(groq.InternalServerError):
+        asyncio.run(client.create(**REQUEST))
+
+    assert config.requests == 3
+    assert client.metrics.retries == 2
+    assert client.metrics.failures == 1
+
+
+def test_analysis_falls_back_when_retries_run_out(stub, monkeypatch):
+    from app.voicebot import llm
+
+    _, url = stub(latency_ms=5, error_rate=1.0)
+    monkeypatch.setattr(llm, "async_llm_client", make_client(url, max_retries=1))
+    processor = llm.LLMProcessor()
+    processor.prescreener = None
+    processor.response_cache = None
+
+    result = asyncio.run(processor.analyze_depression_async("I went to the shop today", "stub-session"))
+
+    assert result["reason"] == "Error occurred"
+    assert result["confidence"] == 0.0
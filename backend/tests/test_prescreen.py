@@ -0,0 +1,50 @@
+import pytest
+
+from app.voicebot.prescreen import KeywordPrescreener
+
+
+@pytest.fixture(scope="module")
+def prescreener():
+    return KeywordPrescreener()
+
+
+@pytest.mark.parametrize("text", [
+    "I keep thinking about killing myself",
+    "I've been thinking about self-harm",
+    "I want to end it all",
+    "I'm ok but honestly everyone would be better off without me",
+    "Sometimes I wish I was dead",
+    "I don't want to wake up anymore",
+    "I'm not going to hurt myself, I promise",
+])
+def test_risk_phrases_always_escalate(prescreener, text):
+    result = prescreener.assess(text)
+    assert result["escalate"]
+    assert result["is_depressed"]
+    assert result["reason"].startswith("Risk phrase")
+
+
+@pytest.mark.parametrize("text", [
+    "I feel sad",
+    "I'm so tired and hopeless lately",
+    "I'm fine, just a bit lonely",
+    "I'm not happy",
+    "I'm not depressed, I'm fine and happy",
+])
+def test_depressive_terms_escalate(prescreener, text):
+    assert prescreener.assess(text)["escalate"]
+
+
+def test_single_positive_keyword_is_not_enough(prescreener):
+    assert prescreener.assess("I'm ok")["escalate"]
+
+
+def test_no_signal_escalates(prescreener):
+    assert prescreener.assess("I went to the shop this morning")["escalate"]
+
+
+def test_clearly_positive_utterance_stays_local(prescreener):
+    result = prescreener.assess("I'm feeling great and really happy with how things are going")
+    assert not result["escalate"]
+    assert not result["is_depressed"]
+    assert result["confidence"] >= prescreener.threshold